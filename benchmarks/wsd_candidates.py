@@ -0,0 +1,62 @@
+"""
+Microbenchmark of the WSD candidate pipeline: builds the (example, target: gloss) pairs of a target word
+with the pandas pipeline GlossPredictor used before, and with the list based candidate_glosses/read_pairs,
+checks that both give the same pairs, and times them.
+
+    python benchmarks/wsd_candidates.py --glosses 3 --number 2000
+    python benchmarks/wsd_candidates.py --glosses 3 --normalize
+"""
+
+import re
+import argparse
+import timeit
+import pandas as pd
+from sinatools.wsd.wsd import senttarget, candidate_glosses, read_pairs, normalizearabert
+
+
+def pandas_pairs(diac_lemma, undiac_lemma, target, example, glosses, normalize):
+    # The candidates dataframe and the loop over its rows GlossPredictor used before
+    example = senttarget(target, example)
+    data = []
+    for g in glosses:
+        data.append([g, diac_lemma, undiac_lemma, glosses[g], target, example, 0, 1, '', '', ''])
+    dfcolumns = ['Concept_id', 'Diac_lemma', 'Undiac_lemma', 'Gloss', 'Target', 'Example', 'Is_training', 'Label', 'concept_id', 'lemma_id', 'POS']
+    dfcand = pd.DataFrame(data, columns=dfcolumns)
+    dfcand['Example'] = dfcand['Example'].apply(lambda x: example)
+    dfcand['Target'] = dfcand['Target'].apply(lambda x: target)
+    dfcand = dfcand.drop_duplicates()
+    dfcand['Example'] = dfcand['Example'].apply(lambda x: x.upper())
+    dfcand['Example'] = dfcand['Example'].apply(lambda x: re.sub(r'^((.?\[UNUSED0\].?){1})\[UNUSED0\]', r'\1[UNUSED1]', x))
+
+    pairs = []
+    for i, row in dfcand.iterrows():
+        pairs.append((normalize(row['Example']), '{}: {}'.format(target, normalize(row['Gloss']))))
+    return dfcand['Concept_id'].to_list(), pairs
+
+
+def list_pairs(diac_lemma, undiac_lemma, target, example, glosses, normalize):
+    example, candidates = candidate_glosses(diac_lemma, undiac_lemma, target, example, glosses)
+    return [concept_id for concept_id, _ in candidates], read_pairs(example, candidates, normalize, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WSD candidate pipeline')
+    parser.add_argument('--glosses', type=int, default=3, help='Number of candidate glosses of the target word')
+    parser.add_argument('--number', type=int, default=2000, help='Number of calls to time')
+    parser.add_argument('--normalize', action='store_true', help='Include the AraBERT normalization in the timing')
+    args = parser.parse_args()
+
+    normalize = normalizearabert if args.normalize else str
+    sentence = "تمشيت بين الجداول في الحديقة وقت الغروب"
+    glosses = {str(303000000 + i): "معنى رقم {} لكلمة الجداول في المعجم".format(i) for i in range(args.glosses)}
+    call = ("جَدْوَلٌ", "جدول", "الجداول", sentence, glosses, normalize)
+
+    assert pandas_pairs(*call) == list_pairs(*call), "the pipelines give different pairs"
+
+    for name, fn in (("pandas", pandas_pairs), ("lists", list_pairs)):
+        seconds = timeit.timeit(lambda: fn(*call), number=args.number)
+        print("{:<8} {:8.1f} us per call".format(name, seconds / args.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
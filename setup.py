@@ -23,6 +23,7 @@ requirements = [
     'torchvision==0.20.1',
     'seqeval==1.2.2',
     'natsort==7.1.1',
+    'safetensors',
     'pandas',
     'pyarabic'
 ]
@@ -56,14 +57,20 @@ setup(
                 'sinatools.CLI.morphology.morph_analyzer:main'),
             ('alma_multi_word='
                 'sinatools.CLI.morphology.ALMA_multi_word:main'),
+            ('compile_lexicon='
+                'sinatools.CLI.morphology.compile_lexicon:main'),
             ('entity_extractor='
                 'sinatools.CLI.ner.entity_extractor:main'),
+            ('export_ner_checkpoint='
+                'sinatools.CLI.ner.export_checkpoint:main'),
             ('remove_punctuation='
                 'sinatools.CLI.utils.remove_punctuation:main'),
             ('remove_latin='
                 'sinatools.CLI.utils.remove_latin:main'),
             ('wsd='
                 'sinatools.CLI.wsd.disambiguator:main'),
+            ('prepare_wsd_glosses='
+                'sinatools.CLI.wsd.prepare_glosses:main'),
             ('corpus_tokenizer='
                 'sinatools.CLI.utils.corpus_tokenizer:main'),
             ('appdatadir='
@@ -80,6 +87,8 @@ setup(
                 'sinatools.CLI.synonyms.extend_synonyms:main'),                    
             ('semantic_relatedness='
                 'sinatools.CLI.semantic_relatedness.compute_relatedness:main'),
+            ('build_relatedness_index='
+                'sinatools.CLI.semantic_relatedness.build_relatedness_index:main'),
             ('relation_extractor='
                 'sinatools.CLI.relations.relation_extractor:main'),
         ],
@@ -0,0 +1,64 @@
+"""
+About:
+------
+The compile_lexicon command converts the lemmas dictionary of the morphological analyzer (lemmas_dic.pickle) into a read-only, memory-mapped lexicon file. The variant index of the dictionary, used to resolve the words that are not found as is, is written next to it, in the same format. When the lexicon file exists, the morphological analyzer uses it instead of the pickle: it starts without unpickling the whole dictionary, and worker processes on the same host share one copy of the lexicon through the page cache.
+
+Usage:
+------
+Below is the usage information that can be generated by running compile_lexicon --help.
+
+.. code-block:: none
+
+    compile_lexicon [OPTIONS]
+
+Options:
+--------
+
+.. code-block:: none
+
+  --input INPUT_FILE
+        Path of the lemmas dictionary pickle, the default is the one downloaded by download_files.
+  --output OUTPUT_FILE
+        Path of the lexicon file, the default is lemmas_dic.lex in the application data directory. The variant index is written to the same path with the .variants.lex extension.
+
+Examples:
+---------
+
+.. code-block:: none
+
+    compile_lexicon
+    compile_lexicon --input "path/to/lemmas_dic.pickle" --output "path/to/lemmas_dic.lex"
+
+"""
+
+import os
+import pickle
+import argparse
+from sinatools.DataDownload import downloader
+from sinatools.morphology import LEXICON_FILE
+from sinatools.morphology.lexicon import write_lexicon, build_variant_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the lemmas dictionary into a memory-mapped lexicon')
+
+    parser.add_argument('--input', type=str, default=os.path.join(downloader.get_appdatadir(), 'lemmas_dic.pickle'),
+                        help='Path of the lemmas dictionary pickle')
+    parser.add_argument('--output', type=str, default=os.path.join(downloader.get_appdatadir(), LEXICON_FILE),
+                        help='Path of the lexicon file')
+
+    args = parser.parse_args()
+
+    with open(args.input, 'rb') as f:
+        dictionary = pickle.load(f)
+
+    variant_index_path = os.path.splitext(args.output)[0] + '.variants.lex'
+
+    write_lexicon(dictionary, args.output)
+    write_lexicon(build_variant_index(dictionary.keys()), variant_index_path)
+    print(args.output)
+    print(variant_index_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,7 +21,7 @@ Options:
         The text that needs to be morphologically analyzed. 
 
   --file FILE
-        File containing the text to be morphologically analyzed
+        File containing the texts to be morphologically analyzed, one text per line. The file is read line by line, and the results of each line are printed as one JSON list (JSON Lines), so large files are analyzed in constant memory.
 
   --language LANGUAGE [default=MSA]
         Specifies the language for the analysis. In the current version, MSA is only supported.
@@ -47,9 +47,9 @@ Examples:
 
 """
 
+import json
 import argparse
-from sinatools.morphology.morph_analyzer import analyze
-from sinatools.utils.readfile import read_file
+from sinatools.morphology.morph_analyzer import analyze, analyze_stream
 
 def main():
     parser = argparse.ArgumentParser(description='Morphological Analysis using SinaTools')
@@ -66,15 +66,18 @@ def main():
         print("Error: Either --text or --file argument must be provided.")
         return
 
-    # Get the input either from the --text argument or from the file specified in the --file argument
-    input_text = args.text if args.text else " ".join(read_file(args.file))
-
-    # Perform morphological analysis
-    results = analyze(input_text, args.language, args.task, args.flag)
-
-    # Print the results
-    for result in results:
-        print(result)
+    if args.text:
+        # Perform morphological analysis
+        results = analyze(args.text, args.language, args.task, args.flag)
+
+        # Print the results
+        for result in results:
+            print(result)
+    else:
+        # Analyze the file line by line, and print the results of each line as it is analyzed
+        with open(args.file, 'r', encoding='utf-8') as f:
+            for results in analyze_stream(f, args.language, args.task, args.flag):
+                print(json.dumps(results, ensure_ascii=False), flush=True)
 
 if __name__ == '__main__':
     main()
@@ -38,17 +38,13 @@ Examples:
 import argparse
 import json
 import pandas as pd
-from sinatools.ner.entity_extractor import extract
+from sinatools.ner.entity_extractor import extract, extract_batch
 from sinatools.utils.tokenizer import corpus_tokenizer
 from sinatools.utils.tokenizers_words import simple_word_tokenize
 
 def jsons_to_list_of_lists(json_list):
     return [[d['token'], d['tags']] for d in json_list]
 
-def combine_tags(sentence):
-    output = jsons_to_list_of_lists(extract(sentence, "nested"))
-    return [word[1] for word in output]
-
 
 def main():
     parser = argparse.ArgumentParser(description='NER Analysis using ArabiNER')
@@ -72,12 +68,13 @@ def main():
         result = df.drop_duplicates(subset=['Global Sentence ID', 'Sentence'])
         unique_sentences = result['Sentence'].to_numpy()
 
-        for sentence in unique_sentences: 
-            ner_tags = combine_tags(sentence) 
+        for sentence in unique_sentences:
             if len(simple_word_tokenize(sentence)) > 300:
                 print(" Length of this sentence is more than 300 word:  ", sentence)
                 return
-            
+
+        for output in extract_batch(list(unique_sentences), ner_method="nested"):
+            ner_tags = [word[1] for word in jsons_to_list_of_lists(output)]
             df.loc[i:i+len(ner_tags)-1, 'NER tags'] = ner_tags 
             i = i + len(ner_tags)
         
@@ -0,0 +1,64 @@
+"""
+About:
+------
+The export_ner_checkpoint command writes an inference only checkpoint of the NER model. The checkpoint holds the model weights only, without the optimizer state, in the safetensors format. When it exists, it is loaded instead of the training checkpoints, and its weights are memory-mapped, so worker processes on the same host share one copy of the weights. The command also stores the BERT config of the model as bert_config.json in the model directory, so loading the model builds BERT from it instead of downloading the pretrained BERT weights first.
+
+Usage:
+------
+Below is the usage information that can be generated by running export_ner_checkpoint --help.
+
+.. code-block:: none
+
+    export_ner_checkpoint [OPTIONS]
+
+Options:
+--------
+
+.. code-block:: none
+
+  --model_path MODEL_PATH
+        Directory of the NER model, the default is the model downloaded by download_files.
+  --output OUTPUT_FILE
+        Path of the exported checkpoint, the default is MODEL_PATH/checkpoints/model.safetensors
+
+Examples:
+---------
+
+.. code-block:: none
+
+    export_ner_checkpoint
+    export_ner_checkpoint --model_path "path/to/model" --output "path/to/model.safetensors"
+
+"""
+
+import os
+import argparse
+from sinatools.DataDownload import downloader
+from sinatools.ner.helpers import load_checkpoint, store_bert_config, BERT_CONFIG_FILE
+from sinatools.ner.trainers.BaseTrainer import INFERENCE_CHECKPOINT
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export an inference only NER checkpoint')
+
+    parser.add_argument('--model_path', type=str, default=os.path.join(downloader.get_appdatadir(), 'Wj27012000.tar'),
+                        help='Directory of the NER model')
+    parser.add_argument('--output', type=str, help='Path of the exported checkpoint')
+
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.model_path, "checkpoints", INFERENCE_CHECKPOINT)
+
+    # Export the latest training checkpoint, not a previously exported inference checkpoint
+    tagger, _, _ = load_checkpoint(args.model_path, prefer_inference=False)
+    tagger.export(output)
+    print(output)
+
+    # With the BERT config next to the checkpoint, loading the model builds BERT from it instead of
+    # downloading the pretrained weights that the checkpoint overwrites
+    store_bert_config(args.model_path, tagger.model)
+    print(os.path.join(args.model_path, BERT_CONFIG_FILE))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+About:
+------
+The build_relatedness_index command encodes a corpus of Arabic sentences into an index for semantic retrieval. The embeddings of the sentences are stored as a memory-mapped float16 matrix, with the ID and the text of each sentence in a sidecar file. The index is searched with `sinatools.semantic_relatedness.index.load_index(path).search(query, k)`, which returns the k sentences most related to the query. For large corpora, the option --n_lists adds an IVF partition so a search only scores the sentences of the partitions nearest to the query.
+
+Usage:
+------
+Below is the usage information that can be generated by running build_relatedness_index --help.
+
+.. code-block:: none
+
+    build_relatedness_index --file CORPUS_FILE --output INDEX_DIR [OPTIONS]
+
+Options:
+--------
+
+.. code-block:: none
+
+  --file CORPUS_FILE
+        File with one Arabic sentence per line, empty lines are skipped.
+  --output INDEX_DIR
+        Directory of the index, created if it does not exist.
+  --with_ids
+        Each line is an ID and a sentence separated by a tab, the default ID of a sentence is its line number.
+  --n_lists N_LISTS
+        Number of clusters of the IVF partition, the default is 0 (no partition).
+  --batch_size BATCH_SIZE
+        Number of sentences encoded in one forward pass, the default is 64.
+
+Examples:
+---------
+
+.. code-block:: none
+
+    build_relatedness_index --file "path/to/corpus.txt" --output "path/to/index"
+    build_relatedness_index --file "path/to/corpus.tsv" --output "path/to/index" --with_ids --n_lists 1024
+
+"""
+
+import argparse
+from sinatools.semantic_relatedness.index import build_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Encode a corpus into a semantic relatedness index')
+
+    parser.add_argument('--file', type=str, required=True, help='File with one sentence per line')
+    parser.add_argument('--output', type=str, required=True, help='Directory of the index')
+    parser.add_argument('--with_ids', action='store_true', help='Each line is an ID and a sentence separated by a tab')
+    parser.add_argument('--n_lists', type=int, default=0, help='Number of clusters of the IVF partition')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of sentences encoded in one forward pass')
+
+    args = parser.parse_args()
+
+    ids = []
+    sentences = []
+    with open(args.file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if args.with_ids:
+                sentence_id, _, line = line.partition('\t')
+            else:
+                sentence_id = line_number
+            if line.strip():
+                ids.append(sentence_id)
+                sentences.append(line)
+
+    build_index(sentences, args.output, ids=ids, batch_size=args.batch_size, n_lists=args.n_lists)
+    print(f"{len(sentences)} sentences indexed in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
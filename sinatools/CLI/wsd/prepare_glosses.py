@@ -0,0 +1,88 @@
+"""
+About:
+------
+The prepare_wsd_glosses command prepares, once and offline, the glosses that the word sense disambiguation uses. It decodes the JSON glosses of every lemma of one_gram.pickle, so the WSD loads them ready to use instead of decoding them on lookups. It also normalizes the glosses of the single words and of the multi-word lemmas, so the WSD looks them up instead of running the AraBERT preprocessor on every gloss of every ambiguous word. Both files are stored next to one_gram.pickle. Glosses that are not found are normalized when they are used, as before.
+
+Usage:
+------
+Below is the usage information that can be generated by running prepare_wsd_glosses --help.
+
+.. code-block:: none
+
+    prepare_wsd_glosses [OPTIONS]
+
+Options:
+--------
+
+.. code-block:: none
+
+  --output OUTPUT_FILE
+        Path of the normalized glosses, the default is one_gram_normalized.pickle in the application data directory.
+  --decoded_output OUTPUT_FILE
+        Path of the decoded glosses, the default is one_gram_decoded.pickle in the application data directory.
+
+Examples:
+---------
+
+.. code-block:: none
+
+    prepare_wsd_glosses
+    prepare_wsd_glosses --output "path/to/one_gram_normalized.pickle" --decoded_output "path/to/one_gram_decoded.pickle"
+
+"""
+
+import os
+import json
+import pickle
+import argparse
+from sinatools.DataDownload import downloader
+from sinatools.morphology import get_n_grams_dict
+from sinatools.wsd import get_glosses_dic, decode_lemma_glosses, NORMALIZED_GLOSSES_FILE, DECODED_GLOSSES_FILE
+from sinatools.wsd.wsd import normalizearabert
+
+
+def iter_glosses(decoded_glosses):
+    # Glosses of the single words
+    for _, glosses in decoded_glosses.values():
+        for gloss in glosses:
+            yield gloss['gloss']
+
+    # Glosses of the multi-word lemmas, as one JSON object for each concept
+    for n in (2, 3, 4, 5):
+        for result_word in get_n_grams_dict(n).values():
+            for result in result_word:
+                try:
+                    gloss = json.loads(result[3])
+                except (ValueError, TypeError):
+                    continue
+                if isinstance(gloss, dict) and 'gloss' in gloss:
+                    yield gloss['gloss']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize the WSD glosses offline')
+
+    parser.add_argument('--output', type=str, default=os.path.join(downloader.get_appdatadir(), NORMALIZED_GLOSSES_FILE),
+                        help='Path of the normalized glosses')
+    parser.add_argument('--decoded_output', type=str, default=os.path.join(downloader.get_appdatadir(), DECODED_GLOSSES_FILE),
+                        help='Path of the decoded glosses')
+
+    args = parser.parse_args()
+
+    decoded_glosses = {lemma_id: decode_lemma_glosses(value) for lemma_id, value in get_glosses_dic().items()}
+
+    normalized_glosses = {}
+    for gloss in iter_glosses(decoded_glosses):
+        if isinstance(gloss, str) and gloss not in normalized_glosses:
+            normalized_glosses[gloss] = normalizearabert(gloss)
+
+    for path, data in ((args.decoded_output, decoded_glosses), (args.output, normalized_glosses)):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f)
+        os.replace(tmp_path, path)
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,24 @@
 from sinatools.utils.parser import arStrip
-from . import five_grams_dict, four_grams_dict  , three_grams_dict , two_grams_dict
+from sinatools.morphology import get_n_grams_dict
+from sinatools.utils.lazy_loader import LazyResource
 
 def ALMA_multi_word(multi_word, n):
     undiac_multi_word = arStrip(multi_word, True, True, True, False, True, False)  # diacs , smallDiacs , shaddah ,  digit , alif , specialChars
     result_word = []
     if n == 2:
+        two_grams_dict = get_n_grams_dict(2)
         if undiac_multi_word in two_grams_dict.keys():
             result_word = two_grams_dict[undiac_multi_word]                    
     elif n == 3:
+        three_grams_dict = get_n_grams_dict(3)
         if undiac_multi_word in three_grams_dict.keys():
             result_word = three_grams_dict[undiac_multi_word]                    
     elif n == 4:
+        four_grams_dict = get_n_grams_dict(4)
         if undiac_multi_word in four_grams_dict.keys():
             result_word = four_grams_dict[undiac_multi_word]                    
     else:    
+     five_grams_dict = get_n_grams_dict(5)
      if undiac_multi_word in five_grams_dict.keys():
          result_word = five_grams_dict[undiac_multi_word]            
     
@@ -28,4 +33,87 @@ def ALMA_multi_word(multi_word, n):
            ids.append(result[3])
         my_json['ids'] = ids
         output_list.append(my_json)    
-    return output_list  
\ No newline at end of file
+    return output_list  
+
+
+# Per token, the same characters arStrip removes or unifies in ALMA_multi_word: diacs, shaddah, small diacs, alif
+_MULTI_WORD_TABLE = {c: None for c in range(0x064B, 0x0653)}
+_MULTI_WORD_TABLE.update({c: None for c in range(0x06D6, 0x06EE)})
+_MULTI_WORD_TABLE.update({ord(c): 'ا' for c in 'ٱأإآ'})
+
+
+def _token_key(token):
+    # Key piece of a token in the normalized multi-word key, None if the token disappears from the key.
+    # arStrip collapses the spaces around a token that becomes empty, but removes underscore and tatweel
+    # after collapsing the spaces, so a token made only of them leaves an empty piece
+    token = token.translate(_MULTI_WORD_TABLE)
+    if token == '':
+        return None
+    return token.replace('_', '').replace('ـ', '')
+
+
+class MultiWordTrie:
+    def __init__(self, n_grams_dicts):
+        """
+        Token trie over the normalized keys of the 2 to 5 grams dictionaries. Each node maps the next key
+        piece to its child, and a node where a key ends holds the dictionary entries of that key under None,
+        by the number of words of the dictionary
+        :param n_grams_dicts: dict - n-grams dictionary by n
+        """
+        self.root = {}
+        self.max_n = max(n_grams_dicts)
+
+        for n, n_grams_dict in n_grams_dicts.items():
+            for key, result_word in n_grams_dict.items():
+                node = self.root
+                for piece in (key.split(' ') if key else []):
+                    node = node.setdefault(piece, {})
+                node.setdefault(None, {})[n] = result_word
+
+    def find(self, tokens):
+        """
+        Find the n-grams of the tokens that are in the dictionaries, in one pass over the tokens. The key of
+        an n-gram is the one ALMA_multi_word looks up: its tokens joined by spaces, then stripped
+        :param tokens: list[str] - tokens of a sentence
+        :return: List[Tuple[int, int, list]] - start, n and the dictionary entries of each n-gram found,
+                 ordered by start then by n
+        """
+        keys = [_token_key(token) for token in tokens]
+        matches = []
+
+        for start in range(len(tokens)):
+            node = self.root
+            # Node of the key after stripping: the trailing empty pieces are not part of the key
+            key_node = self.root
+            leading = True
+
+            for end in range(start, min(start + self.max_n, len(tokens))):
+                piece = keys[end]
+                if piece is None or (leading and piece == ''):
+                    pass
+                elif piece == '':
+                    # Part of the key only if a non-empty piece follows it
+                    if node is not None:
+                        node = node.get(piece)
+                else:
+                    leading = False
+                    node = node.get(piece) if node is not None else None
+                    if node is None:
+                        break
+                    key_node = node
+
+                n = end - start + 1
+                if n > 1 and None in key_node and n in key_node[None]:
+                    matches.append((start, n, key_node[None][n]))
+
+        return matches
+
+
+_multi_word_trie = LazyResource(lambda: MultiWordTrie({n: get_n_grams_dict(n) for n in (2, 3, 4, 5)}))
+
+
+def get_multi_word_trie():
+    """
+    Returns the token trie over the 2 to 5 grams dictionaries, it is built on first use
+    """
+    return _multi_word_trie.get()
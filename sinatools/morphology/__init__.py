@@ -1,43 +1,91 @@
 import pickle
 from sinatools.DataDownload import downloader
+from sinatools.utils.lazy_loader import LazyResource
+from sinatools.morphology.lexicon import MappedLexicon, build_variant_index
 import os 
 
-dictionary = {}
-five_grams_dict = {} 
-four_grams_dict = {}
-three_grams_dict = {}
-two_grams_dict = {} 
-
-filename = 'lemmas_dic.pickle'
-path = downloader.get_appdatadir()
-file_path = os.path.join(path, filename)
-with open(file_path, 'rb') as f:
-    dictionary = pickle.load(f)
-
-filename_five = 'five_grams.pickle'
-path =downloader.get_appdatadir()
-file_path = os.path.join(path, filename_five)
-with open(file_path, 'rb') as f:
-   five_grams_dict = pickle.load(f, encoding='utf-8')
-
-
-filename_four = 'four_grams.pickle'
-path =downloader.get_appdatadir()
-file_path = os.path.join(path, filename_four)
-with open(file_path, 'rb') as f:
-  four_grams_dict = pickle.load(f, encoding='utf-8')
-  
-     
-filename_three = 'three_grams.pickle'
-path =downloader.get_appdatadir()
-file_path = os.path.join(path, filename_three)
-with open(file_path, 'rb') as f:
-  three_grams_dict = pickle.load(f, encoding='utf-8')
-  
-
-filename_two = 'two_grams.pickle'
-path =downloader.get_appdatadir()
-file_path = os.path.join(path, filename_two)
-with open(file_path, 'rb') as f:
-  two_grams_dict = pickle.load(f, encoding='utf-8')
-  
\ No newline at end of file
+
+def _load_pickle(filename, **kwargs):
+    file_path = os.path.join(downloader.get_appdatadir(), filename)
+    with open(file_path, 'rb') as f:
+        return pickle.load(f, **kwargs)
+
+
+LEXICON_FILE = 'lemmas_dic.lex'
+VARIANT_INDEX_FILE = 'lemmas_dic.variants.lex'
+
+
+def _load_dictionary():
+    # Prefer the memory-mapped lexicon written by compile_lexicon, it is shared between processes
+    lexicon_path = os.path.join(downloader.get_appdatadir(), LEXICON_FILE)
+    if os.path.exists(lexicon_path):
+        return MappedLexicon(lexicon_path)
+    return _load_pickle('lemmas_dic.pickle')
+
+
+def _load_variant_index():
+    # Written by compile_lexicon with the lexicon, otherwise built from the dictionary keys
+    index_path = os.path.join(downloader.get_appdatadir(), VARIANT_INDEX_FILE)
+    if isinstance(get_dictionary(), MappedLexicon) and os.path.exists(index_path):
+        return MappedLexicon(index_path)
+    return build_variant_index(get_dictionary().keys())
+
+
+_dictionary = LazyResource(_load_dictionary)
+_variant_index = LazyResource(_load_variant_index)
+
+_n_grams_dicts = {
+    5: LazyResource(lambda: _load_pickle('five_grams.pickle', encoding='utf-8')),
+    4: LazyResource(lambda: _load_pickle('four_grams.pickle', encoding='utf-8')),
+    3: LazyResource(lambda: _load_pickle('three_grams.pickle', encoding='utf-8')),
+    2: LazyResource(lambda: _load_pickle('two_grams.pickle', encoding='utf-8')),
+}
+
+
+def get_dictionary():
+    """
+    Returns the lemmas dictionary used by the morphological analyzer. The dictionary is loaded on first use, from the memory-mapped lexicon if it was compiled, otherwise from the pickle.
+    """
+    return _dictionary.get()
+
+
+def get_variant_index():
+    """
+    Returns the variant index of the lemmas dictionary, which maps the variant key of a word (see `sinatools.morphology.lexicon.variant_key`) to the dictionary keys that have the same variant key. The index is loaded on first use.
+    """
+    return _variant_index.get()
+
+
+def get_n_grams_dict(n):
+    """
+    Returns the multi-word dictionary of n-grams, for n from 2 to 5. The dictionary is loaded on first use.
+    """
+    return _n_grams_dicts[n].get()
+
+
+def preload():
+    """
+    Loads all morphology resources now instead of on first use, for services that want to warm up.
+    """
+    from sinatools.morphology.ALMA_multi_word import get_multi_word_trie
+    get_dictionary()
+    get_variant_index()
+    for n in _n_grams_dicts:
+        get_n_grams_dict(n)
+    get_multi_word_trie()
+
+
+_MODULE_RESOURCES = {
+    'dictionary': get_dictionary,
+    'five_grams_dict': lambda: get_n_grams_dict(5),
+    'four_grams_dict': lambda: get_n_grams_dict(4),
+    'three_grams_dict': lambda: get_n_grams_dict(3),
+    'two_grams_dict': lambda: get_n_grams_dict(2),
+}
+
+
+def __getattr__(name):
+    # The resources used to be module globals, keep them reachable by their old names
+    if name in _MODULE_RESOURCES:
+        return _MODULE_RESOURCES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
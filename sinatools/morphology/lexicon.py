@@ -0,0 +1,185 @@
+"""Read-only, memory-mapped lexicon files.
+
+A lexicon file holds a dictionary with string keys in a layout that can be
+looked up without unpickling the whole dictionary. Keys are UTF-8 encoded and
+sorted, so a lookup is a binary search over the key table. Each value is
+pickled on its own in a packed record area, and only the records that are
+looked up get unpickled. The file is memory-mapped, so all processes on a host
+share one copy of it through the page cache.
+
+File layout (all integers are little-endian unsigned 64-bit)::
+
+    magic             8 bytes, b"SINALEX1"
+    count             number of keys
+    key_offsets       count + 1 offsets into the key area
+    record_offsets    count + 1 offsets into the record area
+    key area          UTF-8 keys, in sorted byte order
+    record area       pickled values, in the order of the keys
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+from collections.abc import Mapping
+
+MAGIC = b"SINALEX1"
+_HEADER = struct.Struct("<8sQ")
+_OFFSET = struct.Struct("<Q")
+
+
+def write_lexicon(dictionary, path):
+    """Write a dictionary to a lexicon file.
+
+    The file is written to a temporary file first and moved into place, so
+    processes that have the old file mapped keep a consistent view of it.
+
+    Args:
+        dictionary: Dictionary with string keys and picklable values.
+        path: Path of the lexicon file.
+    """
+    items = sorted((key.encode("utf-8"), value) for key, value in dictionary.items())
+    keys = [key for key, _ in items]
+    records = [pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) for _, value in items]
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, len(keys)))
+        for blobs in (keys, records):
+            offset = 0
+            fh.write(_OFFSET.pack(offset))
+            for blob in blobs:
+                offset += len(blob)
+                fh.write(_OFFSET.pack(offset))
+        for blobs in (keys, records):
+            for blob in blobs:
+                fh.write(blob)
+    os.replace(tmp_path, path)
+
+
+class _OffsetTable:
+    """Little-endian offset table, read one offset at a time on big-endian hosts."""
+
+    def __init__(self, buffer, start):
+        self._buffer = buffer
+        self._start = start
+
+    def __getitem__(self, i):
+        return _OFFSET.unpack_from(self._buffer, self._start + i * _OFFSET.size)[0]
+
+
+def _offset_table(buffer, start, end):
+    # A native cast is the fastest way to read the offsets, but it only has the file's byte order on little-endian hosts
+    if sys.byteorder == "little":
+        return memoryview(buffer)[start:end].cast("Q")
+    return _OffsetTable(buffer, start)
+
+
+class MappedLexicon(Mapping):
+    """Read-only dictionary backed by a memory-mapped lexicon file.
+
+    It can be used in place of the dictionary it was written from: lookups,
+    ``in``, ``len``, ``keys()`` and iteration behave the same, but values are
+    unpickled on each lookup, so changes to a returned value are not kept.
+
+    Args:
+        path: Path of a lexicon file written by :func:`write_lexicon`.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a lexicon file")
+
+        table_size = (count + 1) * _OFFSET.size
+        key_offsets_start = _HEADER.size
+        record_offsets_start = key_offsets_start + table_size
+        keys_start = record_offsets_start + table_size
+
+        self._count = count
+        self._key_offsets = _offset_table(self._mm, key_offsets_start, record_offsets_start)
+        self._record_offsets = _offset_table(self._mm, record_offsets_start, keys_start)
+        self._keys_start = keys_start
+        self._records_start = keys_start + self._key_offsets[count]
+
+    def _key(self, i):
+        start = self._keys_start
+        return self._mm[start + self._key_offsets[i]:start + self._key_offsets[i + 1]]
+
+    def _find(self, key):
+        try:
+            key = key.encode("utf-8")
+        except (AttributeError, UnicodeEncodeError):
+            # Keys that are not strings, or cannot be encoded like a lone surrogate, are not in the lexicon
+            return -1
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == key:
+            return lo
+        return -1
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        start = self._records_start
+        return pickle.loads(self._mm[start + self._record_offsets[i]:start + self._record_offsets[i + 1]])
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key(i).decode("utf-8")
+
+
+# Removes the diacritics and the shaddah [ً-ْ] and unifies alif [ٱ أ إ آ] into ا
+_VARIANT_TABLE = {c: None for c in range(0x064B, 0x0653)}
+_VARIANT_TABLE.update({ord(c): "ا" for c in "ٱأإآ"})
+
+
+def variant_key(word):
+    """Return the key of a word in the variant index.
+
+    The key is the word without diacritics and shaddah and with a unified
+    alif. The fallback forms the morphological analyzer tries for a word
+    (unified alif, removed diacritics, or both) all have the same key as the
+    word, so every dictionary key that one of them can match is in the same
+    entry of the variant index.
+
+    Args:
+        word: Arabic word.
+
+    Returns:
+        The variant key of the word.
+    """
+    return word.translate(_VARIANT_TABLE)
+
+
+def build_variant_index(keys):
+    """Build the variant index of dictionary keys.
+
+    Args:
+        keys: Keys of the lemmas dictionary.
+
+    Returns:
+        Dictionary that maps each variant key to the tuple of dictionary keys
+        that have it.
+    """
+    index = {}
+    for key in keys:
+        index.setdefault(variant_key(key), []).append(key)
+    return {variant: tuple(group) for variant, group in index.items()}
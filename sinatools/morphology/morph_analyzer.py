@@ -1,17 +1,21 @@
 import re
+import functools
 from sinatools.utils.tokenizers_words import simple_word_tokenize
 from sinatools.utils.parser import arStrip
 from sinatools.utils.charsets import AR_CHARSET, AR_DIAC_CHARSET
 from sinatools.DataDownload.downloader import get_appdatadir
 from sinatools.utils.parser import remove_punctuation
-from . import dictionary
+from sinatools.morphology import get_dictionary, get_variant_index
+from sinatools.morphology.lexicon import variant_key
 
 _IS_AR_RE = re.compile(u'^[' + re.escape(u''.join(AR_CHARSET)) + u']+$')
+_UNIFY_ALEF_TABLE = {ord(c): 'ا' for c in 'ٱأإآ'}
+_REMOVE_DIACS_TABLE = {c: None for c in range(0x064B, 0x0653)}
 
 def find_solution(token, language, flag):    
-    if token in dictionary.keys():
+    solutions = get_dictionary().get(token)
+    if solutions is not None:
         resulted_solutions = [] 
-        solutions = dictionary[token]
         if flag == '1':
            solutions = [solutions[0]]
         for solution in solutions:
@@ -22,6 +26,26 @@ def find_solution(token, language, flag):
         return []
 
 
+def find_variant_solution(token, language, flag):
+    # The fallback forms of an Arabic token, in the order they are tried: unify alef, remove diacs and shaddah, both
+    # All of them have the same variant key as the token, so one probe into the variant index gives every
+    # dictionary key they can match, and a miss there means none of them is in the dictionary
+    word_undiac_unify_alef = variant_key(token)
+    candidates = get_variant_index().get(word_undiac_unify_alef)
+    if not candidates:
+        return []
+
+    # Same as arStrip with these flags, for tokens that pass _is_ar
+    word_with_unify_alef = token.translate(_UNIFY_ALEF_TABLE)
+    word_undiac = token.translate(_REMOVE_DIACS_TABLE)
+    for word in (word_with_unify_alef, word_undiac, word_undiac_unify_alef):
+        if word in candidates:
+            result_token = find_solution(word, language, flag)
+            if result_token != []:
+                return result_token
+    return []
+
+
 
 def analyze(text, language ='MSA', task ='full', flag="1"):
    """
@@ -95,57 +119,148 @@ def analyze(text, language ='MSA', task ='full', flag="1"):
    tokens = simple_word_tokenize(text)
 
    for token in tokens:
-         result_token = []
-         token = arStrip(token , False , True , False , False , False , False) 
-         token = re.sub('[ٱ]','ﺍ',token)
-         # token, freq, lemma, lemma_id, root, pos
-         solution = [token, 0, token, 0, token, ""]
-
-         if token.isdigit():
-            solution[5] = "رقم" #pos
-
-         elif remove_punctuation(token).strip() == "":
-            solution[5] = "علامة ترقيم" #pos
-
-         elif not _is_ar(token):
-            solution[5] = "أجنبي" #pos
-
-         else:
-            result_token = find_solution(token,language,flag)
-            
-            if result_token == []:
-               token_without_al = re.sub(r'^[ﻝ]','',re.sub(r'^[ﺍ]','',token))
-               if len(token_without_al) > 5  :
-                  result_token = find_solution(token_without_al, language, flag)
-
-            if result_token == []:
-              # try with replace ﻩ with ﺓ
-               result_token = find_solution(re.sub(r'[ﻩ]$','ﺓ',token), language, flag)
-               
-
-            if result_token == []:
-               # try with unify Alef
-               word_with_unify_alef = arStrip(token , False , False , False , False , True , False) # Unify Alef
-               result_token = find_solution(word_with_unify_alef, language, flag)
-            
-            if result_token == []:
-               # try with remove diac
-               word_undiac = arStrip(token , True , False , True , True , False , False) # remove diacs, shaddah ,  digit
-               result_token = find_solution(word_undiac, language, flag)
-
-            if result_token == []:
-               # try with remove diac and unify alef
-               word_undiac = arStrip(token , True , True , True , False, True , False) # diacs , smallDiacs , shaddah ,  alif
-               result_token = find_solution(word_undiac, language, flag)
-
-         if result_token != []:
-               output_list += result_token
-         else:
-            output_list += [solution]
+         output_list += _cached_analyze_token(token, language, flag)
         
    return filter_results(output_list, task)
 
 
+def _analyze_token(token, language, flag):
+   # Returns the solutions of one token as a tuple of tuples, the cache shares them between calls so none of them can be mutable
+   result_token = []
+   token = arStrip(token , False , True , False , False , False , False) 
+   token = re.sub('[ٱ]','ﺍ',token)
+   # token, freq, lemma, lemma_id, root, pos
+   solution = [token, 0, token, 0, token, ""]
+
+   if token.isdigit():
+      solution[5] = "رقم" #pos
+
+   elif remove_punctuation(token).strip() == "":
+      solution[5] = "علامة ترقيم" #pos
+
+   elif not _is_ar(token):
+      solution[5] = "أجنبي" #pos
+
+   else:
+      result_token = find_solution(token,language,flag)
+
+      # The fallbacks that removed a leading ﺍ/ﻝ or replaced a final ﻩ with ﺓ matched the presentation
+      # forms of these letters, which never pass _is_ar, so they only looked the token up again
+      if result_token == []:
+         # try with unify Alef, then remove diac, then remove diac and unify alef
+         result_token = find_variant_solution(token, language, flag)
+
+   if result_token != []:
+         return tuple(tuple(item) for item in result_token)
+   else:
+      return (tuple(solution),)
+
+
+DEFAULT_CACHE_SIZE = 100000
+_cached_analyze_token = functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_analyze_token)
+
+
+def set_cache_size(maxsize=DEFAULT_CACHE_SIZE):
+   """
+    Sets the size of the cache of analyzed tokens used by `analyze`. The cache is keyed by (token, language, flag) and discards the least recently used tokens when it is full. Frequent tokens are then analyzed only once. Resizing the cache empties it.
+
+    Parameters:
+        maxsize (:obj:`int`): The maximum number of cached tokens, `0` disables the cache and `None` makes it unbounded. The default is 100000.
+   """
+   global _cached_analyze_token
+   if maxsize == 0:
+      _cached_analyze_token = _analyze_token
+   else:
+      _cached_analyze_token = functools.lru_cache(maxsize=maxsize)(_analyze_token)
+
+
+def cache_info():
+   """
+    Returns the statistics of the cache of analyzed tokens, as a named tuple of hits, misses, maxsize and currsize, or `None` if the cache is disabled.
+   """
+   if _cached_analyze_token is _analyze_token:
+      return None
+   return _cached_analyze_token.cache_info()
+
+
+def clear_cache():
+   """
+    Empties the cache of analyzed tokens and resets its statistics.
+   """
+   if _cached_analyze_token is not _analyze_token:
+      _cached_analyze_token.cache_clear()
+
+
+def analyze_batch(texts, language ='MSA', task ='full', flag="1"):
+   """
+    This method analyzes a list of texts, it returns the same results as calling `analyze` for each text, but each distinct token in the batch is analyzed only once.
+
+    Parameters:
+        texts (:obj:`list`): The Arabic texts to be morphologically analyzed.
+        language (:obj:`str`): Currently, only Modern Standard Arabic (MSA) is supported.
+        task (:obj:`str`): The task to filter the results by. Options are [lemmatization, pos, root, full]. The default task if not specified is `full`.
+        flag (:obj:`str`): The flag to filter the returned results, see `analyze`. The default flag if not specified is `1`.
+
+    Returns:
+        list (:obj:`list`): A list with the results of each text, in the same order as the texts, where the results of a text are the list of JSON objects returned by `analyze`.
+
+    **Example:**
+
+     .. highlight:: python
+     .. code-block:: python
+
+        from sinatools.morphology.morph_analyzer import analyze_batch
+
+        analyze_batch(['ذهب الولد الى المدرسة', 'ذهب الولد'], task='lemmatization')
+   """
+   texts_tokens = [simple_word_tokenize(text) for text in texts]
+
+   # Solutions of each distinct token in the batch
+   solutions = {}
+   for tokens in texts_tokens:
+      for token in tokens:
+         if token not in solutions:
+            solutions[token] = _cached_analyze_token(token, language, flag)
+
+   return [filter_results([item for token in tokens for item in solutions[token]], task) for tokens in texts_tokens]
+
+
+def analyze_stream(lines, language ='MSA', task ='full', flag="1", chunk_size=1000):
+   """
+    This method analyzes an iterable of texts, such as the lines of a file, and yields the results of each text as soon as its chunk is analyzed. The texts are analyzed in chunks of `chunk_size` texts with `analyze_batch`, so the memory used does not grow with the number of texts.
+
+    Parameters:
+        lines (:obj:`iterable`): The Arabic texts to be morphologically analyzed.
+        language (:obj:`str`): Currently, only Modern Standard Arabic (MSA) is supported.
+        task (:obj:`str`): The task to filter the results by. Options are [lemmatization, pos, root, full]. The default task if not specified is `full`.
+        flag (:obj:`str`): The flag to filter the returned results, see `analyze`. The default flag if not specified is `1`.
+        chunk_size (:obj:`int`): The number of texts analyzed together. The default is 1000.
+
+    Returns:
+        generator: The results of each text, in the same order as the texts, where the results of a text are the list of JSON objects returned by `analyze`.
+
+    **Example:**
+
+     .. highlight:: python
+     .. code-block:: python
+
+        from sinatools.morphology.morph_analyzer import analyze_stream
+
+        with open('corpus.txt', encoding='utf-8') as f:
+            for results in analyze_stream(f):
+                print(results)
+   """
+   chunk = []
+   for line in lines:
+      chunk.append(line)
+      if len(chunk) == chunk_size:
+         yield from analyze_batch(chunk, language, task, flag)
+         chunk = []
+
+   if chunk:
+      yield from analyze_batch(chunk, language, task, flag)
+
+
 def filter_results(data, task):
     filtered_data = []
     # token, freq, lemma, lemma_id, root, pos
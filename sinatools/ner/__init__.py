@@ -1,38 +1,67 @@
 from sinatools.DataDownload import downloader
 import os
-from sinatools.ner.helpers import load_object
+from sinatools.ner.helpers import load_object, use_stored_bert_config
+from sinatools.utils.lazy_loader import LazyResource
 import pickle
-import os
 import torch
-from sinatools.ner.data_format import Vocab
 import json
 from argparse import Namespace
 
-tagger = None
-tag_vocab = None
-train_config = None
-
 filename = 'Wj27012000.tar'
 path =downloader.get_appdatadir()
 model_path = os.path.join(path, filename)
 
-_path = os.path.join(model_path, "tag_vocab.pkl")
 
-with open(_path, "rb") as fh:
-    tag_vocab = pickle.load(fh)
+def _load_tagger():
+    _path = os.path.join(model_path, "tag_vocab.pkl")
+
+    with open(_path, "rb") as fh:
+        tag_vocab = pickle.load(fh)
+
+    train_config = Namespace()
+    args_path = os.path.join(model_path, "args.json")
+
+    with open(args_path, "r") as fh:
+        train_config.__dict__ = json.load(fh)
+
+    use_stored_bert_config(model_path, train_config.network_config)
+    model = load_object(train_config.network_config["fn"], train_config.network_config["kwargs"])
+    model = torch.nn.DataParallel(model)
+
+    if torch.cuda.is_available():
+        model = model.cuda()
+
+    train_config.trainer_config["kwargs"]["model"] = model
+    tagger = load_object(train_config.trainer_config["fn"], train_config.trainer_config["kwargs"])
+    tagger.load(os.path.join(model_path,"checkpoints"))
+
+    return tagger, tag_vocab, train_config
+
+
+_tagger = LazyResource(_load_tagger)
+
+
+def get_tagger():
+    """
+    Return the NER tagger with its tag vocab and training configurations, the model is loaded on first use
+    :return: Tuple[sinatools.ner.trainers.BaseTrainer, list[Vocab], argparse.Namespace] - tagger, tag_vocab, train_config
+    """
+    return _tagger.get()
+
 
-train_config = Namespace()
-args_path = os.path.join(model_path, "args.json")
+def preload():
+    """
+    Load the NER model and build its inference session now instead of on first use
+    """
+    from sinatools.ner.entity_extractor import get_session
+    get_session()
 
-with open(args_path, "r") as fh:
-    train_config.__dict__ = json.load(fh)
 
-model = load_object(train_config.network_config["fn"], train_config.network_config["kwargs"])
-model = torch.nn.DataParallel(model)
+_MODULE_RESOURCES = {"tagger": 0, "tag_vocab": 1, "train_config": 2}
 
-if torch.cuda.is_available():
-    model = model.cuda()
 
-train_config.trainer_config["kwargs"]["model"] = model
-tagger = load_object(train_config.trainer_config["fn"], train_config.trainer_config["kwargs"])
-tagger.load(os.path.join(model_path,"checkpoints"))
+def __getattr__(name):
+    # The tagger used to be loaded at import time into module globals, keep them reachable by their old names
+    if name in _MODULE_RESOURCES:
+        return get_tagger()[_MODULE_RESOURCES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,34 +1,29 @@
 import torch
-from transformers import BertTokenizer
-from functools import partial
+from transformers import BertTokenizerFast
 import re
 import itertools
-from sinatools.ner.data import datasets
+
+# Shared with sinatools.ner.transforms, so both tokenization paths encode segments the same way
+from sinatools.ner.transforms import encode_segment
+
+
 class BertSeqTransform:
     def __init__(self, bert_model, vocab, max_seq_len=512):
-        self.tokenizer = BertTokenizer.from_pretrained(bert_model)
-        self.encoder = partial(
-            self.tokenizer.encode,
-            max_length=max_seq_len,
-            truncation=True,
-        )
+        self.tokenizer = BertTokenizerFast.from_pretrained(bert_model)
         self.max_seq_len = max_seq_len
         self.vocab = vocab
 
     def __call__(self, segment):
         subwords, tags, tokens = list(), list(), list()
-        unk_token = datasets.Token(text="UNK")
 
-        for token in segment:
-            token_subwords = self.encoder(token.text)[1:-1]
+        # Sub-tokens/subwords after the first one of each token have no token attached (None)
+        for token, token_subwords in zip(segment, encode_segment(self.tokenizer, segment)):
             subwords += token_subwords
             tags += [self.vocab.tags[0].get_stoi()[token.gold_tag[0]]] + [self.vocab.tags[0].get_stoi()["O"]] * (len(token_subwords) - 1)
-            tokens += [token] + [unk_token] * (len(token_subwords) - 1)
+            tokens += [token] + [None] * (len(token_subwords) - 1)
 
         # Truncate to max_seq_len
         if len(subwords) > self.max_seq_len - 2:
-            text = " ".join([t.text for t in tokens if t.text != "UNK"])
-          
             subwords = subwords[:self.max_seq_len - 2]
             tags = tags[:self.max_seq_len - 2]
             tokens = tokens[:self.max_seq_len - 2]
@@ -39,32 +34,27 @@ class BertSeqTransform:
         tags.insert(0, self.vocab.tags[0].get_stoi()["O"])
         tags.append(self.vocab.tags[0].get_stoi()["O"])
 
-        tokens.insert(0, unk_token)
-        tokens.append(unk_token)
+        tokens.insert(0, None)
+        tokens.append(None)
 
         return torch.LongTensor(subwords), torch.LongTensor(tags), tokens, len(tokens)
 
 
 class NestedTagsTransform:
     def __init__(self, bert_model, vocab, max_seq_len=512):
-        self.tokenizer = BertTokenizer.from_pretrained(bert_model)
-        self.encoder = partial(
-            self.tokenizer.encode,
-            max_length=max_seq_len,
-            truncation=True,
-        )
+        self.tokenizer = BertTokenizerFast.from_pretrained(bert_model)
         self.max_seq_len = max_seq_len
         self.vocab = vocab
 
     def __call__(self, segment):
         tags, tokens, subwords = list(), list(), list()
-        unk_token = datasets.Token(text="UNK")
 
-        # Encode each token and get its subwords and IDs
-        for token in segment:
-            token.subwords = self.encoder(token.text)[1:-1]
+        # Encode all tokens at once and get the subwords and IDs of each token
+        # Sub-tokens/subwords after the first one of each token have no token attached (None)
+        for token, token_subwords in zip(segment, encode_segment(self.tokenizer, segment)):
+            token.subwords = token_subwords
             subwords += token.subwords
-            tokens += [token] + [unk_token] * (len(token.subwords ) - 1)
+            tokens += [token] + [None] * (len(token.subwords) - 1)
 
         # Construct the labels for each tag type
         # The sequence will have a list of tags for each type
@@ -91,15 +81,13 @@ class NestedTagsTransform:
 
         # Truncate to max_seq_len
         if len(subwords) > self.max_seq_len - 2:
-            text = " ".join([t.text for t in tokens if t.text != "UNK"])
-          
             subwords = subwords[:self.max_seq_len - 2]
             tags = [t[:self.max_seq_len - 2] for t in tags]
             tokens = tokens[:self.max_seq_len - 2]
 
         # Add dummy token at the start end of sequence
-        tokens.insert(0, unk_token)
-        tokens.append(unk_token)
+        tokens.insert(0, None)
+        tokens.append(None)
 
         # Add CLS and SEP at start end of subwords
         subwords.insert(0, self.tokenizer.cls_token_id)
@@ -107,6 +107,18 @@ def text2segments(text):
     return dataset, segment_vocab
 
 
+def texts2segments(texts):
+    """
+    Convert a list of texts to a dataset with one segment per text and index the tokens
+    """
+    dataset = [[Token(text=token, gold_tag=["O"]) for token in simple_word_tokenize(text)] for text in texts]
+    tokens = [token.text for segment in dataset for token in segment]
+
+    # Generate vocabs for the tokens
+    segment_vocab = Vocab(Counter(tokens), specials=["UNK"])
+    return dataset, segment_vocab
+
+
 def get_dataloaders(
     datasets, vocab, data_config, batch_size=32, num_workers=0, shuffle=(True, False, False)
 ):
@@ -54,6 +54,7 @@ class DefaultDataset(Dataset):
         vocab=None,
         bert_model="aubmindlab/bert-base-arabertv2",
         max_seq_len=512,
+        transform=None,
     ):
         """
         The dataset that used to transform the segments into training data
@@ -62,8 +63,9 @@ class DefaultDataset(Dataset):
         :param vocab: vocab object containing indexed tags and tokens
         :param bert_model: str - BERT model
         :param: int - maximum sequence length
+        :param transform: transform object to reuse instead of building a new one (and loading its tokenizer)
         """
-        self.transform = BertSeqTransform(bert_model, vocab, max_seq_len=max_seq_len)
+        self.transform = transform or BertSeqTransform(bert_model, vocab, max_seq_len=max_seq_len)
         self.examples = examples
         self.vocab = vocab
 
@@ -99,6 +101,7 @@ class NestedTagsDataset(Dataset):
         vocab=None,
         bert_model="aubmindlab/bert-base-arabertv2",
         max_seq_len=512,
+        transform=None,
     ):
         """
         The dataset that used to transform the segments into training data
@@ -107,8 +110,9 @@ class NestedTagsDataset(Dataset):
         :param vocab: vocab object containing indexed tags and tokens
         :param bert_model: str - BERT model
         :param: int - maximum sequence length
+        :param transform: transform object to reuse instead of building a new one (and loading its tokenizer)
         """
-        self.transform = NestedTagsTransform(
+        self.transform = transform or NestedTagsTransform(
             bert_model, vocab, max_seq_len=max_seq_len
         )
         self.examples = examples
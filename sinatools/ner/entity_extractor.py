@@ -1,7 +1,9 @@
-import os
-from collections import namedtuple
-from sinatools.ner.data_format import get_dataloaders, text2segments
-from . import tagger, tag_vocab, train_config
+from collections import namedtuple, Counter
+from torch.utils.data import DataLoader
+from sinatools.ner.helpers import load_object
+from sinatools.ner.data_format import Vocab, text2segments, texts2segments
+from sinatools.ner import get_tagger
+from sinatools.utils.lazy_loader import LazyResource
 
 
 def convert_nested_to_flat(nested_tags):
@@ -27,6 +29,117 @@ def convert_nested_to_flat(nested_tags):
     
     return flat_tags
 
+
+class NerSession:
+    def __init__(self, tagger, tag_vocab, train_config, batch_size=32):
+        """
+        Inference session that builds the tokenizer, transform and tag vocab once
+        and reuses them for every call, only the segments change between calls
+        :param tagger: sinatools.ner.trainers.BaseTrainer - loaded tagger
+        :param tag_vocab: list[Vocab] - indexed tags
+        :param train_config: argparse.Namespace - training configurations
+        :param batch_size: int
+        """
+        self.tagger = tagger
+        self.tag_vocab = tag_vocab
+        self.batch_size = batch_size
+        self.dataset_fn = train_config.data_config["fn"]
+        self.dataset_kwargs = {k: v for k, v in train_config.data_config["kwargs"].items()
+                               if k not in ("examples", "vocab")}
+
+        # Build an empty dataset once, just to get its transform (and the tokenizer in it)
+        # The transform only depends on the tag vocab, which is the same for all calls
+        self.transform = None
+        self.transform = self.dataset([], Vocab(Counter(), specials=["UNK"])).transform
+
+    def vocab(self, token_vocab):
+        vocabs = namedtuple("Vocab", ["tags", "tokens"])
+        return vocabs(tokens=token_vocab, tags=self.tag_vocab)
+
+    def dataset(self, segments, token_vocab):
+        """
+        Wrap the segments into the dataset configured for the model
+        :param segments: list[[Token]] - list of segments
+        :param token_vocab: Vocab - indexed tokens of the segments
+        :return: torch.utils.data.Dataset
+        """
+        kwargs = dict(self.dataset_kwargs, examples=segments, vocab=self.vocab(token_vocab), transform=self.transform)
+        return load_object(self.dataset_fn, kwargs)
+
+    def dataloader(self, segments, token_vocab):
+        dataset = self.dataset(segments, token_vocab)
+        return DataLoader(
+            dataset=dataset,
+            shuffle=False,
+            batch_size=self.batch_size,
+            num_workers=0,
+            collate_fn=dataset.collate_fn,
+        )
+
+    def extract(self, text, ner_method="nested"):
+        dataset, token_vocab = text2segments(text)
+        segments = self.tagger.infer(self.dataloader(dataset, token_vocab))
+        return segments_to_json(segments, ner_method)
+
+    def extract_batch(self, texts, batch_size=None, ner_method="nested"):
+        """
+        Tag many texts, each text is one segment. Segments are sorted by their
+        subword length and batched, so sequences in a batch have similar lengths
+        and little padding. Results are returned in the input order
+        :param texts: list[str]
+        :param batch_size: int - defaults to the session batch size
+        :param ner_method: str - nested or flat
+        :return: list[list[dict]] - one list of tagged tokens per text
+        """
+        batch_size = batch_size or self.batch_size
+        segments, token_vocab = texts2segments(texts)
+        dataset = self.dataset(segments, token_vocab)
+
+        # Transform every segment once, the subword length of each is known afterwards
+        features = [dataset[i] for i in range(len(dataset))]
+        order = sorted(range(len(features)), key=lambda i: len(features[i][0]))
+
+        batches = (dataset.collate_fn([features[i] for i in order[j:j + batch_size]])
+                   for j in range(0, len(order), batch_size))
+        tagged_segments = self.tagger.infer(batches, vocab=dataset.vocab)
+
+        results = [None] * len(texts)
+        for i, segment in zip(order, tagged_segments):
+            results[i] = segments_to_json([segment], ner_method)
+
+        return results
+
+
+def segments_to_json(segments, ner_method="nested"):
+    segments_lists = []
+
+    for segment in segments:
+        for token in segment:
+            segments_list = {}
+            segments_list["token"] = token.text
+            list_of_tags = [t['tag'] for t in token.pred_tag]
+            list_of_tags = [i for i in list_of_tags if i not in('O',' ','')]
+            if list_of_tags == []:
+               segments_list["tags"] = ' '.join(['O'])
+            else:
+               segments_list["tags"] = ' '.join(list_of_tags)
+            segments_lists.append(segments_list)
+
+    if ner_method == "flat":
+      segments_lists = convert_nested_to_flat(segments_lists)
+    return segments_lists
+
+
+_session = LazyResource(lambda: NerSession(*get_tagger()))
+
+
+def get_session():
+    """
+    Return the NER session shared by the module level functions, it is created on first use
+    """
+    return _session.get()
+
+
 def extract(text, ner_method="nested"):
     """
     This method processes an input text and returns named entites for each token within the text. It support 21 class of entites. The method also support flat and nested NER. You can try the demo online. See article for details.
@@ -70,35 +183,28 @@ def extract(text, ner_method="nested"):
         }]    
     """
 
-    dataset, token_vocab = text2segments(text)
+    return get_session().extract(text, ner_method)
 
-    vocabs = namedtuple("Vocab", ["tags", "tokens"])
-    vocab = vocabs(tokens=token_vocab, tags=tag_vocab)
 
-    dataloader = get_dataloaders(
-        (dataset,),
-        vocab,
-        train_config.data_config,
-        batch_size=32,
-        shuffle=(False,),
-    )[0]
+def extract_batch(texts, batch_size=32, ner_method="nested"):
+    """
+    This method tags a list of texts in batches, it is faster than calling `extract` for each text. Texts are sorted by their length before batching, to keep the padding small, and the results are returned in the same order of the input.
 
+    Args:
+        * texts (:obj:`list`) – The Arabic texts to be tagged, each text is tagged as one segment.
+        * batch_size (:obj:`int`) – Number of texts in each batch passed to the model. The default is 32.
+        * ner_method (:obj:`str`) – The NER method can produce either flat or nested output formats. The default method is nested.
 
-    segments = tagger.infer(dataloader)
-    segments_lists = []
-    
-    for segment in segments:
-        for token in segment:
-            segments_list = {}
-            segments_list["token"] = token.text
-            list_of_tags = [t['tag'] for t in token.pred_tag]
-            list_of_tags = [i for i in list_of_tags if i not in('O',' ','')]
-            if list_of_tags == []:
-               segments_list["tags"] = ' '.join(['O'])
-            else:
-               segments_list["tags"] = ' '.join(list_of_tags)
-            segments_lists.append(segments_list)  
-    
-    if ner_method == "flat":
-      segments_lists = convert_nested_to_flat(segments_lists)          
-    return segments_lists
+    Returns:
+        A list with one entry per input text, each entry is a list of JSON objects as returned by `extract`.
+
+    **Example:**
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from sinatools.ner.entity_extractor import extract_batch
+        extract_batch(['ذهب محمد الى جامعة بيرزيت', 'يقع المسجد الأقصى في القدس'])
+    """
+
+    return get_session().extract_batch(texts, batch_size=batch_size, ner_method=ner_method)
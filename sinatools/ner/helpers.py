@@ -62,10 +62,43 @@ def make_output_dirs(path, subdirs=[], overwrite=True):
         os.makedirs(os.path.join(path, subdir))
 
 
-def load_checkpoint(model_path):
+BERT_CONFIG_FILE = "bert_config.json"
+
+
+def use_stored_bert_config(model_path, network_config):
+    """
+    If the BERT config is stored next to the checkpoint, build the network from
+    it instead of loading the pretrained BERT weights that the checkpoint overwrites anyway
+    :param model_path: str - path to model
+    :param network_config: dict - network configurations, its kwargs are updated in place
+    :return: boolean - True if the stored config is used
+    """
+    bert_config = os.path.join(model_path, BERT_CONFIG_FILE)
+
+    if not os.path.exists(bert_config):
+        return False
+
+    network_config["kwargs"]["bert_config"] = bert_config
+    return True
+
+
+def store_bert_config(model_path, model):
+    """
+    Store the BERT config of the model next to the checkpoint, so later loads can skip the pretrained weights,
+    loading a model never stores it, it is written by BaseTrainer.save and by the export_ner_checkpoint command
+    :param model_path: str - path to model
+    :param model: torch.nn.Module - the tagger model, optionally wrapped in torch.nn.DataParallel
+    :return: None
+    """
+    model = getattr(model, "module", model)
+    model.bert.config.to_json_file(os.path.join(model_path, BERT_CONFIG_FILE))
+
+
+def load_checkpoint(model_path, prefer_inference=True):
     """
     Load model given the model path
     :param model_path: str - path to model
+    :param prefer_inference: boolean - False loads the latest training checkpoint even if an inference checkpoint exists
     :return: tagger - arabiner.trainers.BaseTrainer - the tagger model
              vocab - arabicner.utils.data.Vocab - indexed tags
              train_config - argparse.Namespace - training configurations
@@ -82,6 +115,7 @@ def load_checkpoint(model_path):
     loss = load_object(train_config.loss["fn"], train_config.loss["kwargs"])
 
     # Load BERT tagger
+    use_stored_bert_config(model_path, train_config.network_config)
     model = load_object(train_config.network_config["fn"], train_config.network_config["kwargs"])
     model = torch.nn.DataParallel(model)
 
@@ -94,7 +128,8 @@ def load_checkpoint(model_path):
     train_config.trainer_config["kwargs"]["loss"] = loss
 
     tagger = load_object(train_config.trainer_config["fn"], train_config.trainer_config["kwargs"])
-    tagger.load(os.path.join(model_path, "checkpoints"))
+    tagger.load(os.path.join(model_path, "checkpoints"), prefer_inference=prefer_inference)
+
     return tagger, tag_vocab, train_config
 
 
@@ -1,16 +1,37 @@
 from torch import nn
-from transformers import BertModel
+from transformers import BertModel, BertConfig
+from transformers.modeling_utils import no_init_weights
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def load_bert(bert_model, bert_config=None):
+    """
+    Load the BERT encoder
+    :param bert_model: str - pretrained BERT model name or path
+    :param bert_config: str - path to a stored BERT config, if given only the architecture is
+                        built from it and the pretrained weights are not loaded, this is used
+                        when all the weights are restored later from a checkpoint
+    :return: transformers.BertModel
+    """
+    if bert_config is None:
+        return BertModel.from_pretrained(bert_model)
+
+    logger.info("Building BERT from config %s", bert_config)
+
+    # The weights are overwritten by the checkpoint, skip their random initialization
+    with no_init_weights():
+        return BertModel(BertConfig.from_json_file(bert_config))
+
+
 class BaseModel(nn.Module):
     def __init__(self,
                  bert_model="aubmindlab/bert-base-arabertv2",
                  num_labels=2,
                  dropout=0.1,
-                 num_types=0):
+                 num_types=0,
+                 bert_config=None):
         super().__init__()
 
         self.bert_model = bert_model
@@ -18,5 +39,5 @@ class BaseModel(nn.Module):
         self.num_types = num_types
         self.dropout = dropout
 
-        self.bert = BertModel.from_pretrained(bert_model)
+        self.bert = load_bert(bert_model, bert_config)
         self.dropout = nn.Dropout(dropout)
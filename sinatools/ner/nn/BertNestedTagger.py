@@ -12,7 +12,9 @@ class BertNestedTagger(BaseModel):
         self.classifiers = torch.nn.Sequential(*classifiers)
 
     def forward(self, x):
-        y = self.bert(x)
+        # Subwords are padded with 0 when segments of different lengths are batched, mask the padding
+        # so each segment is tagged the same as when it is alone in its batch
+        y = self.bert(x, attention_mask=(x != 0).long())
         y = self.dropout(y["last_hidden_state"])
         output = list()
 
@@ -1,17 +1,19 @@
 import torch.nn as nn
-from transformers import BertModel
+from sinatools.ner.nn.BaseModel import load_bert
 
 
 class BertSeqTagger(nn.Module):
-    def __init__(self, bert_model, num_labels=2, dropout=0.1):
+    def __init__(self, bert_model, num_labels=2, dropout=0.1, bert_config=None):
         super().__init__()
 
-        self.bert = BertModel.from_pretrained(bert_model)
+        self.bert = load_bert(bert_model, bert_config)
         self.dropout = nn.Dropout(dropout)
         self.linear = nn.Linear(768, num_labels)
 
     def forward(self, x):
-        y = self.bert(x)
+        # Subwords are padded with 0 when segments of different lengths are batched, mask the padding
+        # so each segment is tagged the same as when it is alone in its batch
+        y = self.bert(x, attention_mask=(x != 0).long())
         y = self.dropout(y["last_hidden_state"])
         logits = self.linear(y)
         return logits
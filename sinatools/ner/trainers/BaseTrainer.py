@@ -3,9 +3,12 @@ import torch
 import logging
 import natsort
 import glob
+from sinatools.ner.helpers import store_bert_config
 
 logger = logging.getLogger(__name__)
 
+INFERENCE_CHECKPOINT = "model.safetensors"
+
 
 class BaseTrainer:
     def __init__(
@@ -101,17 +104,76 @@ class BaseTrainer:
         logger.info("Saving checkpoint to %s", filename)
         torch.save(checkpoint, filename)
 
-    def load(self, checkpoint_path):
+        # Keep the BERT config next to the checkpoints, so inference can build the
+        # network from it without loading the pretrained weights first
+        if hasattr(getattr(self.model, "module", self.model), "bert"):
+            store_bert_config(self.output_path, self.model)
+
+    def export(self, filename):
+        """
+        Save an inference only checkpoint, the model weights without the optimizer state,
+        in the safetensors format that can be memory-mapped when loaded
+        :param filename: str - path/to/model.safetensors
+        :return: None
+        """
+        from safetensors.torch import save_file
+
+        state_dict = {name: tensor.contiguous() for name, tensor in self.model.state_dict().items()}
+
+        # Write to a temporary file first, processes may have the old file memory-mapped
+        logger.info("Exporting inference checkpoint to %s", filename)
+        save_file(state_dict, filename + ".tmp")
+        os.replace(filename + ".tmp", filename)
+
+    def load(self, checkpoint_path, prefer_inference=True):
         """
-        Load model checkpoint
+        Load model checkpoint, the inference checkpoint (model.safetensors) is
+        preferred if it exists and is not older than the latest checkpoint_*.pt,
+        otherwise the latest checkpoint_*.pt is loaded
         :param checkpoint_path: str - path/to/checkpoints
+        :param prefer_inference: boolean - False always loads the latest checkpoint_*.pt,
+                                 as exporting does, so it never exports a stale inference checkpoint
         :return: None
         """
-        checkpoint_path = natsort.natsorted(glob.glob(f"{checkpoint_path}/checkpoint_*.pt"))
-        checkpoint_path = checkpoint_path[-1]
+        inference_checkpoint = os.path.join(checkpoint_path, INFERENCE_CHECKPOINT)
+        training_checkpoints = natsort.natsorted(glob.glob(f"{checkpoint_path}/checkpoint_*.pt"))
+
+        if prefer_inference and os.path.exists(inference_checkpoint):
+            # A checkpoint saved after the export, by retraining, is newer than the exported weights
+            if not training_checkpoints or \
+                    os.path.getmtime(inference_checkpoint) >= os.path.getmtime(training_checkpoints[-1]):
+                self.load_inference_checkpoint(inference_checkpoint)
+                return
+
+            logger.warning("Ignoring %s, %s is newer", inference_checkpoint, training_checkpoints[-1])
+
+        checkpoint_path = training_checkpoints[-1]
 
         logger.info("Loading checkpoint %s", checkpoint_path)
 
         device = None if torch.cuda.is_available() else torch.device('cpu')
         checkpoint = torch.load(checkpoint_path, map_location=device, weights_only=False)
-        self.model.load_state_dict(checkpoint["model"], strict=False)
\ No newline at end of file
+        missing_keys, _ = self.model.load_state_dict(checkpoint["model"], strict=False)
+
+        if missing_keys:
+            logger.warning("Weights not found in checkpoint %s: %s", checkpoint_path, missing_keys)
+
+    def load_inference_checkpoint(self, filename):
+        """
+        Load the model weights from an inference checkpoint written by export
+        :param filename: str - path/to/model.safetensors
+        :return: None
+        """
+        from safetensors.torch import load_file
+
+        logger.info("Loading inference checkpoint %s", filename)
+
+        on_gpu = torch.cuda.is_available()
+        state_dict = load_file(filename, device="cuda" if on_gpu else "cpu")
+
+        # On CPU, the memory-mapped tensors are assigned to the model as they are instead
+        # of being copied, so processes loading the same file share its pages
+        missing_keys, _ = self.model.load_state_dict(state_dict, strict=False, assign=not on_gpu)
+
+        if missing_keys:
+            logger.warning("Weights not found in checkpoint %s: %s", filename, missing_keys)
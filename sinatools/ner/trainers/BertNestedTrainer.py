@@ -163,7 +163,13 @@ class BertNestedTrainer(BaseTrainer):
 
         return preds, segments, valid_lens, loss
 
-    def infer(self, dataloader):
+    def infer(self, dataloader, vocab=None):
+        """
+        Predict the tags of the segments in the dataloader
+        :param dataloader: torch.utils.data.DataLoader or any iterable of collated batches
+        :param vocab: vocab object, defaults to the vocab of the dataloader dataset
+        :return: List[List[Token]] - tagged segments
+        """
         golds, preds, segments, valid_lens = list(), list(), list(), list()
 
         for _, gold_tags, tokens, valid_len, logits in self.tag(
@@ -173,7 +179,10 @@ class BertNestedTrainer(BaseTrainer):
             segments += tokens
             valid_lens += list(valid_len)
 
-        segments = self.to_segments(segments, preds, valid_lens, dataloader.dataset.vocab)
+        if vocab is None:
+            vocab = dataloader.dataset.vocab
+
+        segments = self.to_segments(segments, preds, valid_lens, vocab)
         return segments
 
     def to_segments(self, segments, preds, valid_lens, vocab):
@@ -181,16 +190,14 @@ class BertNestedTrainer(BaseTrainer):
             vocab = self.vocab
 
         tagged_segments = list()
-        tokens_stoi = vocab.tokens.get_stoi()
-        unk_id = tokens_stoi["UNK"]
 
         for segment, pred, valid_len in zip(segments, preds, valid_lens):
             # First, the token at 0th index [CLS] and token at nth index [SEP]
             # Combine the tokens with their corresponding predictions
             segment_pred = zip(segment[1:valid_len-1], pred[1:valid_len-1])
 
-            # Ignore the sub-tokens/subwords, which are identified with text being UNK
-            segment_pred = list(filter(lambda t: tokens_stoi[t[0].text] != unk_id, segment_pred))
+            # Ignore the sub-tokens/subwords, which have no token attached to them
+            segment_pred = list(filter(lambda t: t[0] is not None, segment_pred))
 
             # Attach the predicted tags to each token
             list(map(lambda t: setattr(t[0], 'pred_tag', [{"tag": vocab.get_itos()[tag_id]}
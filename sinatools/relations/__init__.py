@@ -1,7 +1,36 @@
 from sinatools.DataDownload import downloader
+from sinatools.utils.lazy_loader import LazyResource
 import os
-from transformers import pipeline
 
 path =downloader.get_appdatadir()
 
-pipe = pipeline("sentiment-analysis", model= os.path.join(path, "relation_model"), return_all_scores =True, max_length=128, truncation=True)
\ No newline at end of file
+
+def _load_pipe():
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model= os.path.join(path, "relation_model"), return_all_scores =True, max_length=128, truncation=True)
+
+
+_pipe = LazyResource(_load_pipe)
+
+
+def get_pipe():
+    """
+    Returns the relation classification pipeline. The pipeline is loaded on first use.
+    """
+    return _pipe.get()
+
+
+def preload():
+    """
+    Loads the relation pipeline, and the NER model the extractor depends on, now instead of on first use.
+    """
+    from sinatools import ner
+    get_pipe()
+    ner.preload()
+
+
+def __getattr__(name):
+    # The pipeline used to be loaded at import time, keep it reachable by its old name
+    if name == "pipe":
+        return get_pipe()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 from urllib.request import Request, urlopen
-from sinatools.ner.entity_extractor import extract
+from sinatools.ner.entity_extractor import extract, extract_batch
 from sinatools.utils.tokenizer import sentence_tokenizer
+from sinatools.utils.tokenizers_words import simple_word_tokenize
 from sinatools.utils.entity_utils import distill_entities, sortTags
 from .predicate_maps import (
     get_role_category,
@@ -9,14 +10,28 @@ from .predicate_maps import (
     ROLE_CATEGORIES,
     ARABIC_TEMPLATES,
 )
-from . import pipe
+from sinatools.relations import get_pipe
 
 # ============================ Extract entities and their types ========================
 def jsons_to_list_of_lists(json_list):
     return [[d['token'], d['tags']] for d in json_list]
 
 def entities_and_types(sentence):
-    output_list = jsons_to_list_of_lists(extract(sentence))
+    return tags_to_entities(extract(sentence))
+
+def sentences_entities_and_types(sentences):
+    """
+    Same as calling entities_and_types for each sentence, but the NER model tags all the sentences in batches.
+    """
+    sentences_entities = [{} for _ in sentences]
+    # Sentences without tokens have no entities, and are not passed to the model
+    indexes = [i for i, sentence in enumerate(sentences) if simple_word_tokenize(sentence)]
+    for i, tagged_tokens in zip(indexes, extract_batch([sentences[i] for i in indexes])):
+        sentences_entities[i] = tags_to_entities(tagged_tokens)
+    return sentences_entities
+
+def tags_to_entities(tagged_tokens):
+    output_list = jsons_to_list_of_lists(tagged_tokens)
     json_short = distill_entities(output_list)
 
     entities = {}
@@ -45,7 +60,8 @@ def event_argument_relation_extraction(
     fallback_strategy="smart",
     min_confidence=0.0,
     max_relations=None,
-    drop_unknown_predicates=False
+    drop_unknown_predicates=False,
+    batch_size=32
 ):
     """
     Extract event-argument relations from document.
@@ -58,6 +74,7 @@ def event_argument_relation_extraction(
         min_confidence: Minimum confidence threshold for filtering relations (default: 0.0)
         max_relations: Maximum number of relations to return (None = unlimited)
         drop_unknown_predicates: If True, drop relations with 'unknown' predicate type (default: False)
+        batch_size: Number of candidate relations classified in one forward pass (default: 32)
 
     Returns:
         List of extracted relations with TripleID, Subject, Relation, Object, confidence
@@ -67,58 +84,54 @@ def event_argument_relation_extraction(
     relation = {}
     triple_id = 0
 
-    for sentence in sentences:
-        entities = entities_and_types(sentence)
+    # Build the candidate pairs of the whole document first, so the classifier scores them in batches
+    candidates = []
+    for sentence, entities in zip(sentences, sentences_entities_and_types(sentences)):
         entity_identifier = {entity: i for entity, i in zip(entities, range(1, len(entities) + 1))}
 
-        event_indices = [i for i, (_, entity_type) in enumerate(entities.items()) if entity_type == 'EVENT']
-        arg_event_indices = [i for i, (_, entity_type) in enumerate(entities.items()) if entity_type != 'EVENT']
-
-        for i in event_indices:
-            event_entity = list(entities.keys())[i]
-            for j in arg_event_indices:
-                arg_name = list(entities.keys())[j]
-                arg_type = entities[arg_name]
+        events = [(entity, entity_type) for entity, entity_type in entities.items() if entity_type == 'EVENT']
+        arguments = [(entity, entity_type) for entity, entity_type in entities.items() if entity_type != 'EVENT']
 
+        for event_entity, event_type in events:
+            for arg_name, arg_type in arguments:
                 # Get category for template-based approach (original logic)
                 category = get_role_category(arg_type)
 
                 if category and category in ARABIC_TEMPLATES:
                     relation_sentence = f"[CLS] {sentence} [SEP] {event_entity} {ARABIC_TEMPLATES[category]} {arg_name}"
-                    predicted_relation = pipe(relation_sentence)
-                    score = predicted_relation[0][0]['score']
-
-                    if score > score_threshold:
-                        triple_id += 1
-
-                        # Determine predicate based on mode
-                        if use_semantic_predicates:
-                            # Use semantic predicate mapping
-                            predicate = get_semantic_predicate(
-                                entities[event_entity],
-                                arg_type,
-                                fallback_strategy=fallback_strategy
-                            )
-                        else:
-                            # Use original role category
-                            predicate = category
-
-                        relation = {
-                            "TripleID": triple_id,
-                            "Subject": {
-                                "ID": entity_identifier[event_entity],
-                                "Type": entities[event_entity],
-                                "Label": event_entity
-                            },
-                            "Relation": predicate,
-                            "Object": {
-                                "ID": entity_identifier[arg_name],
-                                "Type": entities[arg_name],
-                                "Label": arg_name,
-                            },
-                            "confidence": f"{score: .2f}"
-                        }
-                        output_list.append(relation)
+                    subject = {"ID": entity_identifier[event_entity], "Type": event_type, "Label": event_entity}
+                    object_ = {"ID": entity_identifier[arg_name], "Type": arg_type, "Label": arg_name}
+                    candidates.append((relation_sentence, subject, object_, category))
+
+    # One score list per candidate, each batch is padded to its longest candidate
+    predicted_relations = get_pipe()([candidate[0] for candidate in candidates], batch_size=batch_size) if candidates else []
+
+    for (_, subject, object_, category), predicted_relation in zip(candidates, predicted_relations):
+        score = predicted_relation[0]['score']
+
+        if score > score_threshold:
+            triple_id += 1
+
+            # Determine predicate based on mode
+            if use_semantic_predicates:
+                # Use semantic predicate mapping
+                predicate = get_semantic_predicate(
+                    subject["Type"],
+                    object_["Type"],
+                    fallback_strategy=fallback_strategy
+                )
+            else:
+                # Use original role category
+                predicate = category
+
+            relation = {
+                "TripleID": triple_id,
+                "Subject": subject,
+                "Relation": predicate,
+                "Object": object_,
+                "confidence": f"{score: .2f}"
+            }
+            output_list.append(relation)
 
     # Apply post-extraction filters (P1-T1: Hardening)
     filtered_output = []
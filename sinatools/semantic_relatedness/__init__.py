@@ -1,8 +1,8 @@
 import warnings
 warnings.filterwarnings("ignore")
 from sinatools.DataDownload import downloader
+from sinatools.utils import model_registry
 import os 
-from transformers import BertTokenizer,BertModel
 
 model_file_name = "bert-base-arabertv02_22_May_2021_00h_allglosses_unused01"
 path =downloader.get_appdatadir()
@@ -12,9 +12,34 @@ tokenizer_file_name = "bert-base-arabertv02"
 path =downloader.get_appdatadir()
 tokenizer_file_path = os.path.join(path, tokenizer_file_name)
 
-model = BertModel.from_pretrained('{}'.format(model_file_path),
-                                                      output_hidden_states = True,
-                                                      num_labels=2
-                                                      )
 
-tokenizer = BertTokenizer.from_pretrained('{}'.format(tokenizer_file_path))
\ No newline at end of file
+def get_model():
+    """
+    Returns the encoder used to compute the relatedness. The model is loaded on first use. It is the encoder of the
+    WSD gloss scoring model, so both packages share one copy of it.
+    """
+    return model_registry.get_encoder(model_file_path)
+
+
+def get_tokenizer():
+    """
+    Returns the tokenizer of the relatedness encoder. The tokenizer is loaded on first use.
+    """
+    return model_registry.get_tokenizer(tokenizer_file_path)
+
+
+def preload():
+    """
+    Loads the relatedness model and tokenizer now instead of on first use.
+    """
+    get_model()
+    get_tokenizer()
+
+
+def __getattr__(name):
+    # The model and tokenizer used to be loaded at import time, keep them reachable by their old names
+    if name == "model":
+        return get_model()
+    if name == "tokenizer":
+        return get_tokenizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
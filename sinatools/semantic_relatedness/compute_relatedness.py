@@ -1,6 +1,168 @@
+import threading
+from collections import OrderedDict
+import numpy as np
 import torch
-from . import tokenizer 
-from . import model 
+from sinatools.semantic_relatedness import get_model, get_tokenizer
+
+DEFAULT_CACHE_SIZE = 10000
+
+_cache_lock = threading.Lock()
+_cache_size = DEFAULT_CACHE_SIZE
+_cache = OrderedDict()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def set_cache_size(maxsize=DEFAULT_CACHE_SIZE):
+  """
+    Sets the size of the cache of sentence embeddings used by `encode`. The cache is keyed by the sentence text and discards the least recently used sentences when it is full. Resizing the cache empties it.
+
+    Args:
+        maxsize (:obj:`int`): The maximum number of cached sentences, `0` disables the cache and `None` makes it unbounded. The default is 10000.
+  """
+  global _cache_size
+  with _cache_lock:
+    _cache_size = maxsize
+    _cache.clear()
+
+
+def cache_info():
+  """
+    Returns the statistics of the embedding cache, as a dictionary of hits, misses, maxsize and currsize, or `None` if the cache is disabled.
+  """
+  with _cache_lock:
+    if _cache_size == 0:
+      return None
+    return dict(_cache_stats, maxsize=_cache_size, currsize=len(_cache))
+
+
+def clear_cache():
+  """
+    Empties the embedding cache and resets its statistics.
+  """
+  with _cache_lock:
+    _cache.clear()
+    _cache_stats['hits'] = _cache_stats['misses'] = 0
+
+
+def _cache_get(sentences):
+  with _cache_lock:
+    if _cache_size == 0:
+      return {}
+    found = {}
+    for sentence in sentences:
+      embedding = _cache.get(sentence)
+      if embedding is not None:
+        _cache.move_to_end(sentence)
+        found[sentence] = embedding
+    _cache_stats['hits'] += len(found)
+    _cache_stats['misses'] += len(sentences) - len(found)
+    return found
+
+
+def _cache_put(embeddings):
+  with _cache_lock:
+    if _cache_size == 0:
+      return
+    for sentence, embedding in embeddings.items():
+      _cache[sentence] = embedding
+      _cache.move_to_end(sentence)
+    while _cache_size is not None and len(_cache) > _cache_size:
+      _cache.popitem(last=False)
+
+
+def _embed(sentences, batch_size):
+  tokenizer = get_tokenizer()
+  model = get_model()
+  embeddings = {}
+  # Sentences of similar length go in the same batch, so little of each batch is padding
+  order = sorted(sentences, key=len)
+  for start in range(0, len(order), batch_size):
+    batch = order[start:start + batch_size]
+    inputs = tokenizer(batch, padding=True, truncation=True, max_length=512, return_tensors="pt")
+    with torch.no_grad():
+      hidden = model(**inputs).last_hidden_state
+
+    # Average pool across tokens, excluding padding
+    mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+    pooled = (torch.sum(hidden * mask, dim=1) / torch.sum(mask, dim=1)).cpu().numpy()
+    # Each row is copied, so a cached embedding does not keep the whole batch alive
+    embeddings.update((sentence, row.copy()) for sentence, row in zip(batch, pooled))
+  return embeddings
+
+
+def encode(sentences, batch_size=64, use_cache=True):
+  """
+    Computes the embedding of each sentence, the average of the encoder outputs over its tokens, which is the embedding `get_similarity_score` compares. The sentences are encoded in batches, each distinct sentence is encoded once, and the embeddings of sentences seen before are taken from the embedding cache.
+
+    Args:
+        sentences (:obj:`list`) – The Arabic sentences to encode.
+        batch_size (:obj:`int`) – The number of sentences encoded in one forward pass. The default is 64.
+        use_cache (:obj:`bool`) – Whether the embedding cache is used, encoding a corpus once is faster without it and keeps the cached sentences. The default is True.
+
+    Returns:
+        :obj:`numpy.ndarray`: An array of shape (number of sentences, hidden size) with the embedding of each sentence, in the order of the sentences. An empty list of sentences gives an array of shape (0, 0).
+  """
+  sentences = list(sentences)
+  if not sentences:
+    # Nothing to encode, so the model is not loaded to read its hidden size
+    return np.zeros((0, 0), dtype=np.float32)
+  distinct = list(dict.fromkeys(sentences))
+  embeddings = _cache_get(distinct) if use_cache else {}
+  missing = [sentence for sentence in distinct if sentence not in embeddings]
+  if missing:
+    computed = _embed(missing, batch_size)
+    if use_cache:
+      _cache_put(computed)
+    embeddings.update(computed)
+
+  return np.stack([embeddings[sentence] for sentence in sentences])
+
+
+def normalize_rows(embeddings):
+  """
+    Scales each row of an embedding matrix to unit length, so the dot product of two normalized embeddings is their cosine similarity. Norms are bounded below by 1e-8, as in torch.nn.functional.cosine_similarity.
+
+    Args:
+        embeddings (:obj:`numpy.ndarray`) – The embeddings, one per row, as returned by `encode`.
+
+    Returns:
+        :obj:`numpy.ndarray`: The normalized embeddings.
+  """
+  norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+  return embeddings / np.maximum(norms, 1e-8)
+
+
+def similarity_matrix(list_a, list_b, batch_size=64):
+  """
+    Computes the relatedness score of every pair of sentences from two lists. Each sentence is encoded once, with `encode`, and all the cosine similarities are computed with one matrix product, so scoring one sentence against many takes one forward pass for each distinct sentence.
+
+    Args:
+        list_a (:obj:`list`) – The first list of Arabic sentences.
+        list_b (:obj:`list`) – The second list of Arabic sentences.
+        batch_size (:obj:`int`) – The number of sentences encoded in one forward pass. The default is 64.
+
+    Returns:
+        :obj:`numpy.ndarray`: An array of shape (len(list_a), len(list_b)), the value at [i, j] is the score `get_similarity_score(list_a[i], list_b[j])` returns.
+
+    **Example:**
+
+    .. highlight:: python
+    .. code-block:: python
+
+    from sinatools.semantic_relatedness.compute_relatedness import similarity_matrix
+
+    scores = similarity_matrix(["تبلغ سرعة دوران الأرض حول الشمس حوالي 110 كيلومتر في الساعة."],
+                               ["تدور الأرض حول محورها بسرعة تصل تقريبا 1670 كيلومتر في الساعة.", "الجو جميل"])
+    scores.shape
+    (1, 2)
+  """
+  list_a = list(list_a)
+  list_b = list(list_b)
+  embeddings = encode(list_a + list_b, batch_size)
+  embeddings_a = normalize_rows(embeddings[:len(list_a)])
+  embeddings_b = normalize_rows(embeddings[len(list_a):])
+  return embeddings_a @ embeddings_b.T
+
 
 #cosine using average embedding 
 def get_similarity_score(sentence1, sentence2):
@@ -27,27 +189,4 @@ def get_similarity_score(sentence1, sentence2):
     Score = 0.90
   """         
 
-  # Tokenize and encode sentences
-  inputs1 = tokenizer(sentence1, return_tensors="pt")
-  inputs2 = tokenizer(sentence2, return_tensors="pt")
-
-  # Extract embeddings
-  with torch.no_grad():
-      outputs1 = model(**inputs1)
-      outputs2 = model(**inputs2)
-      
-      embeddings1 = outputs1.last_hidden_state
-      embeddings2 = outputs2.last_hidden_state
-
-  # Mask padding tokens
-  attention_mask1 = inputs1["attention_mask"]
-  attention_mask2 = inputs2["attention_mask"]
-
-  # Average pool across tokens, excluding padding
-  embeddings1_avg = torch.sum(embeddings1 * attention_mask1.unsqueeze(-1), dim=1) / torch.sum(attention_mask1, dim=1, keepdim=True)
-  embeddings2_avg = torch.sum(embeddings2 * attention_mask2.unsqueeze(-1), dim=1) / torch.sum(attention_mask2, dim=1, keepdim=True)
-
-  # Calculate cosine similarity
-  similarity = torch.nn.functional.cosine_similarity(embeddings1_avg, embeddings2_avg)
-
-  return similarity.item()
\ No newline at end of file
+  return float(similarity_matrix([sentence1], [sentence2])[0, 0])
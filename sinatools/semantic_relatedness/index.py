@@ -0,0 +1,267 @@
+"""Nearest-neighbour search over the sentence embeddings of a corpus.
+
+An index is a directory that holds the embeddings of the corpus sentences, as
+computed by :func:`sinatools.semantic_relatedness.compute_relatedness.encode`,
+normalized to unit length and stored as a float16 ``.npy`` matrix. The matrix
+is memory-mapped when the index is opened, so corpora larger than the memory
+can be searched and all processes on a host share one copy of it. The dot
+product of a normalized query with a row is the score ``get_similarity_score``
+gives to the two sentences.
+
+Files of an index::
+
+    embeddings.npy     float16 matrix, one normalized embedding per sentence
+    ids.jsonl          {"id": ..., "sentence": ...} for each row of the matrix
+    ids_offsets.npy    byte offset of each line of ids.jsonl, and the file size
+    centroids.npy      optional, float32 centroids of the IVF partition
+    lists.npy          optional, row numbers grouped by their nearest centroid
+    list_offsets.npy   optional, start of the rows of each centroid in lists.npy
+
+Without a partition, a search scores every row, in blocks of rows. With an IVF
+(inverted file) partition, it only scores the rows of the centroids nearest to
+the query, which is faster on large corpora but can miss some neighbours.
+The lines of ids.jsonl are memory-mapped too, and only the lines of the rows
+a search returns are read.
+"""
+
+import json
+import mmap
+import os
+
+import numpy as np
+
+from sinatools.semantic_relatedness.compute_relatedness import encode, normalize_rows
+
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.jsonl"
+IDS_OFFSETS_FILE = "ids_offsets.npy"
+CENTROIDS_FILE = "centroids.npy"
+LISTS_FILE = "lists.npy"
+OFFSETS_FILE = "list_offsets.npy"
+IVF_FILES = (CENTROIDS_FILE, LISTS_FILE, OFFSETS_FILE)
+
+
+def _save(path, array):
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def build_index(sentences, path, ids=None, batch_size=64, chunk_size=10000, n_lists=0, seed=0):
+    """Encode a corpus and write its index.
+
+    The sentences are encoded ``chunk_size`` at a time and written to the
+    memory-mapped matrix, so only one chunk of embeddings is in memory.
+
+    Args:
+        sentences: Arabic sentences of the corpus.
+        path: Directory of the index, created if it does not exist.
+        ids: ID of each sentence, the default is its position in the corpus.
+            IDs must be JSON serializable.
+        batch_size: Number of sentences encoded in one forward pass.
+        chunk_size: Number of sentences encoded before they are written.
+        n_lists: Number of centroids of the IVF partition, 0 builds no
+            partition.
+        seed: Seed of the centroid initialization.
+
+    Raises:
+        ValueError: If the corpus is empty, or ``ids`` does not have one ID
+            for each sentence.
+    """
+    sentences = list(sentences)
+    ids = list(range(len(sentences))) if ids is None else list(ids)
+    if not sentences:
+        raise ValueError("cannot index an empty corpus")
+    if len(ids) != len(sentences):
+        raise ValueError(f"got {len(ids)} ids for {len(sentences)} sentences")
+
+    os.makedirs(path, exist_ok=True)
+    embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+    tmp_path = embeddings_path + ".tmp.npy"
+    matrix = None
+    for start in range(0, len(sentences), chunk_size):
+        chunk = encode(sentences[start:start + chunk_size], batch_size, use_cache=False)
+        if matrix is None:
+            matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16,
+                                               shape=(len(sentences), chunk.shape[1]))
+        matrix[start:start + len(chunk)] = normalize_rows(chunk)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_path, embeddings_path)
+
+    ids_path = os.path.join(path, IDS_FILE)
+    ids_offsets = np.zeros(len(sentences) + 1, dtype=np.int64)
+    with open(ids_path + ".tmp", "wb") as fh:
+        for i, (sentence_id, sentence) in enumerate(zip(ids, sentences)):
+            line = json.dumps({"id": sentence_id, "sentence": sentence}, ensure_ascii=False) + "\n"
+            ids_offsets[i + 1] = ids_offsets[i] + fh.write(line.encode("utf-8"))
+    os.replace(ids_path + ".tmp", ids_path)
+    _save(os.path.join(path, IDS_OFFSETS_FILE), ids_offsets)
+
+    # A partition of the previous corpus would point at the wrong rows
+    for name in IVF_FILES:
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+    if n_lists:
+        build_ivf(path, n_lists, seed=seed)
+
+
+def _assign(embeddings, centroids, block_size):
+    assignments = np.empty(len(embeddings), dtype=np.int64)
+    for start in range(0, len(embeddings), block_size):
+        block = np.asarray(embeddings[start:start + block_size], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _kmeans(data, n_lists, n_iter, rng, block_size):
+    # Spherical k-means: the rows and the centroids have unit length, rows go to the centroid with the largest dot
+    # product and each centroid is the normalized sum of its rows
+    centroids = data[rng.choice(len(data), n_lists, replace=False)]
+    for _ in range(n_iter):
+        assignments = _assign(data, centroids, block_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        # Centroids that lost all their rows start again from random rows
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums).astype(np.float32)
+    return centroids
+
+
+def build_ivf(path, n_lists, n_iter=10, sample_size=None, seed=0, block_size=65536):
+    """Build the IVF partition of an index.
+
+    The centroids are trained with k-means on a random sample of the
+    embeddings, then every row is assigned to its nearest centroid.
+
+    Args:
+        path: Directory of the index.
+        n_lists: Number of centroids, at most the number of rows.
+        n_iter: Number of k-means iterations.
+        sample_size: Number of rows the centroids are trained on, the default
+            is 256 rows for each centroid.
+        seed: Seed of the sample and of the centroid initialization.
+        block_size: Number of rows scored at once.
+    """
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+    n_lists = max(1, min(n_lists, len(embeddings)))
+    rng = np.random.default_rng(seed)
+
+    sample_size = min(len(embeddings), sample_size or 256 * n_lists)
+    sample = np.sort(rng.choice(len(embeddings), sample_size, replace=False))
+    centroids = _kmeans(np.asarray(embeddings[sample], dtype=np.float32), n_lists, n_iter, rng, block_size)
+
+    assignments = _assign(embeddings, centroids, block_size)
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=n_lists), out=offsets[1:])
+
+    _save(os.path.join(path, CENTROIDS_FILE), centroids)
+    _save(os.path.join(path, LISTS_FILE), np.argsort(assignments, kind="stable"))
+    _save(os.path.join(path, OFFSETS_FILE), offsets)
+
+
+class RelatednessIndex:
+    """Index of the sentence embeddings of a corpus, opened for searching.
+
+    Args:
+        path: Directory of an index written by :func:`build_index`.
+    """
+
+    def __init__(self, path):
+        self.embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        self._ids_offsets = np.load(os.path.join(path, IDS_OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(path, IDS_FILE), "rb") as fh:
+            self._ids = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.centroids = None
+        if all(os.path.exists(os.path.join(path, name)) for name in IVF_FILES):
+            self.centroids = np.load(os.path.join(path, CENTROIDS_FILE))
+            self.lists = np.load(os.path.join(path, LISTS_FILE), mmap_mode="r")
+            self.offsets = np.load(os.path.join(path, OFFSETS_FILE))
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def record(self, row):
+        """Return the ``{"id": ..., "sentence": ...}`` record of a row, read from the sidecar file."""
+        return json.loads(self._ids[self._ids_offsets[row]:self._ids_offsets[row + 1]])
+
+    def _top_k(self, queries, k, rows, block_size):
+        # Keeps the k best rows for each query while the rows are scored one block at a time
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        count = len(self.embeddings) if rows is None else len(rows)
+        for start in range(0, count, block_size):
+            if rows is None:
+                block_rows = np.arange(start, min(start + block_size, count))
+                block = self.embeddings[start:start + block_size]
+            else:
+                block_rows = rows[start:start + block_size]
+                block = self.embeddings[block_rows]
+            scores = queries @ np.asarray(block, dtype=np.float32).T
+
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, np.broadcast_to(block_rows, scores.shape)], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+
+    def _probe(self, query, n_probe):
+        # Rows of the n_probe centroids nearest to the query, in row order so the memory map is read forward
+        nearest = np.argsort(-(self.centroids @ query))[:n_probe]
+        rows = [self.lists[self.offsets[c]:self.offsets[c + 1]] for c in nearest]
+        return np.sort(np.concatenate(rows))
+
+    def search(self, query, k=10, n_probe=8, batch_size=64, block_size=65536):
+        """Return the sentences of the corpus most related to a query.
+
+        Args:
+            query: Arabic sentence, or list of sentences.
+            k: Number of sentences returned for each query.
+            n_probe: Number of IVF centroids whose rows are scored, when the
+                index has a partition. More centroids find more of the true
+                neighbours and take longer.
+            batch_size: Number of queries encoded in one forward pass.
+            block_size: Number of rows scored at once.
+
+        Returns:
+            For a sentence, the list of the ``k`` most related corpus
+            sentences, as dictionaries with the ``id``, the ``sentence`` and
+            its relatedness ``score``, best first. For a list of sentences,
+            the list of results of each of them.
+        """
+        queries = [query] if isinstance(query, str) else list(query)
+        if not queries or k <= 0:
+            return [] if isinstance(query, str) else [[] for _ in queries]
+
+        vectors = normalize_rows(encode(queries, batch_size)).astype(np.float32)
+        if self.centroids is None:
+            scores, rows = self._top_k(vectors, k, None, block_size)
+        else:
+            scores, rows = [], []
+            for vector in vectors:
+                query_scores, query_rows = self._top_k(vector[None, :], k, self._probe(vector, n_probe), block_size)
+                scores.append(query_scores[0])
+                rows.append(query_rows[0])
+
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            results.append([dict(self.record(row), score=float(score)) for score, row in zip(query_scores, query_rows)])
+        return results[0] if isinstance(query, str) else results
+
+
+def load_index(path):
+    """Open the index stored in a directory.
+
+    Args:
+        path: Directory of an index written by :func:`build_index`.
+
+    Returns:
+        The :class:`RelatednessIndex`.
+    """
+    return RelatednessIndex(path)
@@ -1,18 +1,41 @@
 import pickle
 from sinatools.DataDownload import downloader
+from sinatools.utils.lazy_loader import LazyResource
 import os 
 
-synonyms_level2_dict = {} 
-level2_dict = 'graph_l2.pkl'
-path = downloader.get_appdatadir()
-file_path = os.path.join(path, level2_dict)
-with open(file_path, 'rb') as f:
-    synonyms_level2_dict = pickle.load(f, encoding='utf-8')
 
+def _load_graph(filename):
+    path = downloader.get_appdatadir()
+    file_path = os.path.join(path, filename)
+    with open(file_path, 'rb') as f:
+        return pickle.load(f, encoding='utf-8')
 
-synonyms_level3_dict = {}    
-level3_dict = 'graph_l3.pkl'
-path = downloader.get_appdatadir()
-file_path = os.path.join(path, level3_dict)
-with open(file_path, 'rb') as f:
-   synonyms_level3_dict = pickle.load(f, encoding='utf-8')
\ No newline at end of file
+
+_graphs = {
+    2: LazyResource(lambda: _load_graph('graph_l2.pkl')),
+    3: LazyResource(lambda: _load_graph('graph_l3.pkl')),
+}
+
+
+def get_synonyms_graph(level):
+    """
+    Returns the synonyms graph of the given level (2 or 3). The graph is loaded on first use.
+    """
+    return _graphs[level].get()
+
+
+def preload():
+    """
+    Loads both synonyms graphs now instead of on first use.
+    """
+    for level in _graphs:
+        get_synonyms_graph(level)
+
+
+def __getattr__(name):
+    # The graphs used to be loaded at import time, keep them reachable by their old names
+    if name == "synonyms_level2_dict":
+        return get_synonyms_graph(2)
+    if name == "synonyms_level3_dict":
+        return get_synonyms_graph(3)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
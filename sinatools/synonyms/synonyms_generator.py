@@ -1,4 +1,4 @@
-from . import synonyms_level2_dict, synonyms_level3_dict
+from sinatools.synonyms import get_synonyms_graph
 from copy import deepcopy
 
 def dfs(graph, start, end, level):
@@ -100,9 +100,9 @@ def extend_synonyms(synset, level):
     """         
     used_graph = {}
     if level == 2:
-       used_graph = synonyms_level2_dict
+       used_graph = get_synonyms_graph(2)
     elif level == 3:
-       used_graph = synonyms_level3_dict
+       used_graph = get_synonyms_graph(3)
     else: 
        return "Please choose the correct level"   
     
@@ -165,9 +165,9 @@ def evaluate_synonyms(synset, level):
 
    used_graph = {}
    if level == 2:
-      used_graph = synonyms_level2_dict
+      used_graph = get_synonyms_graph(2)
    elif level == 3:
-      used_graph = synonyms_level3_dict
+      used_graph = get_synonyms_graph(3)
    else: 
       return "Please choose the correct level"   
 
@@ -0,0 +1,39 @@
+"""Thread-safe lazy loading of module resources such as models and lexicons.
+
+Packages keep their data files and models in module level resources that are
+loaded on first use, so importing a package (or a CLI that only needs a small
+part of it) does not pay for loads it never uses.
+"""
+
+import threading
+
+
+class LazyResource:
+    """Resource that is loaded on first use.
+
+    The loader runs at most once, even when several threads ask for the
+    resource at the same time.
+
+    Args:
+        loader: Function without arguments that loads and returns the resource.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+    def get(self):
+        """Return the resource, loading it on the first call."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._loader()
+                    self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self):
+        """True if the resource has been loaded."""
+        return self._loaded
@@ -0,0 +1,79 @@
+"""Process wide registry of the transformer models and tokenizers.
+
+Several packages load the same checkpoint: WSD scores glosses with the
+ArabGlossBERT sequence classifier, and semantic relatedness embeds sentences
+with the encoder of that same checkpoint. Loading them through the registry
+keeps one copy of each model and tokenizer per process, whichever package asks
+for it first.
+"""
+
+import os
+import threading
+
+from sinatools.utils.lazy_loader import LazyResource
+
+_lock = threading.Lock()
+_resources = {}
+
+
+def _get(key, loader):
+    with _lock:
+        resource = _resources.get(key)
+        if resource is None:
+            resource = _resources[key] = LazyResource(loader)
+    return resource.get()
+
+
+def get_sequence_classifier(path, num_labels=2):
+    """Return the BERT sequence classifier stored in a directory.
+
+    The model is loaded on the first call for the directory, in evaluation
+    mode, and the same object is returned to every caller after that.
+
+    Args:
+        path: Directory of the model.
+        num_labels: Number of labels of the classification head.
+
+    Returns:
+        The ``BertForSequenceClassification`` model.
+    """
+    def load():
+        from transformers import BertForSequenceClassification
+        model = BertForSequenceClassification.from_pretrained(path, num_labels=num_labels)
+        return model.eval()
+
+    return _get(("sequence_classifier", os.path.abspath(path), num_labels), load)
+
+
+def get_encoder(path, num_labels=2):
+    """Return the BERT encoder of the sequence classifier stored in a directory.
+
+    The encoder is the ``bert`` module of the model returned by
+    :func:`get_sequence_classifier`, so it shares its weights with the
+    classifier instead of being a second copy of them.
+
+    Args:
+        path: Directory of the model.
+        num_labels: Number of labels of the classification head.
+
+    Returns:
+        The ``BertModel`` encoder.
+    """
+    return get_sequence_classifier(path, num_labels).bert
+
+
+def get_tokenizer(path):
+    """Return the BERT tokenizer stored in a directory.
+
+    Args:
+        path: Directory of the tokenizer.
+
+    Returns:
+        The ``BertTokenizer``, loaded on the first call for the directory.
+    """
+    def load():
+        from transformers import BertTokenizer
+        return BertTokenizer.from_pretrained(path)
+
+    return _get(("tokenizer", os.path.abspath(path)), load)
+
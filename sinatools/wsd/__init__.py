@@ -1,11 +1,114 @@
 from sinatools.wsd import settings 
+import json
 import pickle
+import functools
 from sinatools.DataDownload import downloader
+from sinatools.utils.lazy_loader import LazyResource
 import os 
 
-glosses_dic = {}
-filename = 'one_gram.pickle'
-path =downloader.get_appdatadir()
-file_path = os.path.join(path, filename)
-with open(file_path, 'rb') as f:
-    glosses_dic = pickle.load(f)
+
+def _load_glosses_dic():
+    filename = 'one_gram.pickle'
+    path =downloader.get_appdatadir()
+    file_path = os.path.join(path, filename)
+    with open(file_path, 'rb') as f:
+        return pickle.load(f)
+
+
+NORMALIZED_GLOSSES_FILE = 'one_gram_normalized.pickle'
+
+
+def _load_normalized_glosses():
+    # Written by prepare_wsd_glosses, without it the glosses are normalized when they are used
+    file_path = os.path.join(downloader.get_appdatadir(), NORMALIZED_GLOSSES_FILE)
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'rb') as f:
+        return pickle.load(f)
+
+
+DECODED_GLOSSES_FILE = 'one_gram_decoded.pickle'
+
+
+def _load_decoded_glosses():
+    # Written by prepare_wsd_glosses with the glosses of every lemma, otherwise the glosses of each lemma
+    # are decoded on their first lookup
+    file_path = os.path.join(downloader.get_appdatadir(), DECODED_GLOSSES_FILE)
+    if not os.path.exists(file_path):
+        return {}, False
+    with open(file_path, 'rb') as f:
+        return pickle.load(f), True
+
+
+_glosses_dic = LazyResource(_load_glosses_dic)
+_normalized_glosses = LazyResource(_load_normalized_glosses)
+_decoded_glosses = LazyResource(_load_decoded_glosses)
+
+
+def get_glosses_dic():
+    """
+    Returns the glosses dictionary keyed by lemma id. The dictionary is loaded on first use.
+    """
+    return _glosses_dic.get()
+
+
+def decode_lemma_glosses(value):
+    """
+    Decodes a value of the glosses dictionary, [concept_count, glosses as JSON], into (concept_count, glosses). Empty or invalid JSON gives no glosses.
+    """
+    glosses = []
+    if value[1] and value[1].strip():
+        try:
+            glosses = json.loads(value[1])
+        except json.JSONDecodeError:
+            glosses = []
+    return value[0], glosses
+
+
+def get_lemma_glosses(lemma_id):
+    """
+    Returns the (concept_count, glosses) of a lemma, or `None` if the lemma is not in the glosses dictionary. The glosses of each lemma are decoded once and shared between lookups, so they must not be modified.
+    """
+    decoded_glosses, complete = _decoded_glosses.get()
+    lemma_glosses = decoded_glosses.get(lemma_id)
+    if lemma_glosses is None and not complete:
+        glosses_dic = get_glosses_dic()
+        if lemma_id in glosses_dic.keys():
+            lemma_glosses = decoded_glosses[lemma_id] = decode_lemma_glosses(glosses_dic[lemma_id])
+    return lemma_glosses
+
+
+@functools.lru_cache(maxsize=100000)
+def decode_concept(concepts):
+    """
+    Decodes the JSON of a concept of a multi-word lemma. The concepts are decoded once and shared between lookups, so they must not be modified.
+    """
+    return json.loads(concepts)
+
+
+def get_normalized_glosses():
+    """
+    Returns the glosses normalized offline by prepare_wsd_glosses, as a dictionary from the gloss to its normalized text, or an empty dictionary if they were not prepared. The dictionary is loaded on first use.
+    """
+    return _normalized_glosses.get()
+
+
+def preload():
+    """
+    Loads the WSD resources, with the morphology and NER resources it depends on, now instead of on first use.
+    """
+    from sinatools import morphology, ner
+    get_glosses_dic()
+    get_normalized_glosses()
+    _decoded_glosses.get()
+    settings.get_model()
+    settings.get_tokenizer()
+    morphology.preload()
+    ner.preload()
+
+
+def __getattr__(name):
+    # The glosses dictionary used to be loaded at import time, keep it reachable by its old name
+    if name == "glosses_dic":
+        return get_glosses_dic()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
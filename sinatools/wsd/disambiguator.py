@@ -1,13 +1,14 @@
-import json
+import numbers
 from sinatools.wsd import settings
 from sinatools.wsd.wsd import normalizearabert
-from sinatools.wsd.wsd import GlossPredictor
+from sinatools.wsd.wsd import GlossPredictor, GlossPredictorBatch, check_max_candidates
 from sinatools.utils.parser import arStrip
 from sinatools.utils.tokenizers_words import simple_word_tokenize
-from sinatools.morphology.ALMA_multi_word import ALMA_multi_word
+from sinatools.morphology.ALMA_multi_word import get_multi_word_trie
 from sinatools.morphology.morph_analyzer import analyze
-from sinatools.ner.entity_extractor import extract
-from . import glosses_dic
+from sinatools.ner.entity_extractor import extract, extract_batch
+from sinatools.utils.tokenizer import sentence_tokenizer
+from sinatools.wsd import get_lemma_glosses, decode_concept
 
 
 def distill_entities(entities):
@@ -125,99 +126,72 @@ def delete_form_list(position, word_lemma):
            tmp_word_lemma.append(wordLemma)
     return tmp_word_lemma, output, position
 
-def find_two_word_lemma(input_sentence):
-    i = 0
-    output = []
-    length = len(input_sentence)
-    while i < length - 1:
-        two_grams = input_sentence[i] +" "+ input_sentence[i + 1]
-        data = ALMA_multi_word(two_grams, 2)
-        try :
-            glosses_list = []
-            concept_count = 0
-            ids = data[0]["ids"]
-            for concepts in ids:
-               glosses_list.append(json.loads(concepts))
-            concept_count = concept_count + data[0]["POS"]
-            found_2Word_lemma = [two_grams, glosses_list, i, i + 1, concept_count, data[0]['undiac_multi_word_lemma'], data[0]['multi_word_lemma']]
-            output.append(found_2Word_lemma)
-            i = i + 1
-        except:
-            i = i + 1
+def find_multi_word_lemmas(input_sentence):
+    """
+    Find the 2 to 5 word lemmas of the sentence in one pass over its tokens, with the multi-word trie
+    :param input_sentence: list[str] - tokens of the sentence
+    :return: dict - lemmas found, by number of words, each as [n_grams, glosses, start, end, concept_count, undiac_multi_word_lemma, multi_word_lemma]
+    """
+    output = {n: [] for n in (2, 3, 4, 5)}
+    for i, n, result_word in get_multi_word_trie().find(input_sentence):
+        n_grams = " ".join(input_sentence[i:i + n])
+        # Same fields ALMA_multi_word returns for the n-grams
+        concept_count = result_word[0][1] if result_word else None
+        # Entries without a numeric concept count are skipped, as the scans did
+        if not isinstance(concept_count, numbers.Number):
+            continue
+        ids = [result[3] for result in result_word]
+        try:
+            glosses_list = [decode_concept(concepts) for concepts in ids]
+        except (ValueError, TypeError):
+            # Entries with glosses that cannot be decoded are skipped, as the scans did
+            continue
+        output[n].append([n_grams, glosses_list, i, i + n - 1, concept_count, n_grams, n_grams])
     return output
 
 
+# Compatibility shims for callers of the former per-n scans, each one runs a full pass of find_multi_word_lemmas,
+# so code that needs more than one n should call find_multi_word_lemmas once instead, as WSD does
+def find_two_word_lemma(input_sentence):
+    return find_multi_word_lemmas(input_sentence)[2]
+
+
 def find_three_word_lemma(input_sentence):
-    i = 0
-    output = []
-    length = len(input_sentence)
-    while i < length - 2:
-        three_grams = input_sentence[i] +" "+ input_sentence[i + 1] + " "+ input_sentence[i + 2]
-        data = ALMA_multi_word(three_grams, 3)
-        try:
-           glosses_list = []
-           concept_count = 0
-           ids = data[0]["ids"]
-           for concepts in ids:
-              glosses_list.append(json.loads(concepts))
-           concept_count = concept_count + data[0]["POS"]
-           found_3Word_lemma = [three_grams, glosses_list, i, i + 2, concept_count, data[0]['undiac_multi_word_lemma'], data[0]['multi_word_lemma']]
-           output.append(found_3Word_lemma)
-           i = i + 1
-        except:
-           i = i + 1
-    return output
+    return find_multi_word_lemmas(input_sentence)[3]
+
 
 def find_four_word_lemma(input_sentence):
-   i = 0
-   output = []
-   length = len(input_sentence)
-   while i < length - 3:
-      four_grams = input_sentence[i] +" "+ input_sentence[i + 1] + " "+ input_sentence[i + 2] + " "+ input_sentence[i + 3]
-      data = ALMA_multi_word(four_grams, 4)
-      try:
-         glosses_list = []
-         concept_count = 0
-         ids = data[0]["ids"]
-         for concepts in ids:
-            glosses_list.append(json.loads(concepts))
-         concept_count = concept_count + data[0]["POS"]
-         found_4Word_lemma = [four_grams, glosses_list, i, i + 3, concept_count, data[0]['undiac_multi_word_lemma'], data[0]['multi_word_lemma']]
-         output.append(found_4Word_lemma)
-         i = i + 1
-      except:
-         i = i + 1
-   return output
+    return find_multi_word_lemmas(input_sentence)[4]
 
 
 def find_five_word_lemma(input_sentence):
-   i = 0
-   output = []
-   length = len(input_sentence)
-   while i < length - 4:
-      five_grams = input_sentence[i] +" "+ input_sentence[i + 1] + " "+ input_sentence[i + 2] + " "+ input_sentence[i + 3] + " "+ input_sentence[i + 4]
-      data = ALMA_multi_word(five_grams, 5)
-      try:
-         glosses_list = []
-         concept_count = 0
-         ids = data[0]["ids"]
-         for concepts in ids:
-            glosses_list.append(json.loads(concepts))
-         concept_count = concept_count + data[0]["POS"]
-         found_5Word_lemma = [five_grams, glosses_list, i, i + 4, concept_count, data[0]['undiac_multi_word_lemma'], data[0]['multi_word_lemma']]
-         output.append(found_5Word_lemma)
-         i = i + 1
-      except:
-         i = i + 1
-   return output
+    return find_multi_word_lemmas(input_sentence)[5]
 
 def jsons_to_list_of_lists(json_list):
     return [[d['token'], d['tags']] for d in json_list]
 
 def find_named_entities(string):
+   ner_entites = extract(string, "nested")
+   return named_entities(ner_entites)
+
+def find_named_entities_batch(strings):
+   """
+   Same as calling find_named_entities for each string, but the NER model tags all the strings in batches
+   :param strings: list[str] - sentences, with their tokens joined by spaces
+   :return: list[list] - named entities of each sentence
+   """
+   found_entities = [[] for _ in strings]
+   # Strings without tokens have no entities, and are not passed to the model
+   indexes = [i for i, string in enumerate(strings) if simple_word_tokenize(string)]
+   if not indexes:
+      return found_entities
+   for i, ner_entites in zip(indexes, extract_batch([strings[i] for i in indexes], ner_method="nested")):
+      found_entities[i] = named_entities(ner_entites)
+   return found_entities
+
+def named_entities(ner_entites):
    found_entities = []
 
-   ner_entites = extract(string, "nested")
    list_of_entites = jsons_to_list_of_lists(ner_entites)
    entites = distill_entities(list_of_entites)
 
@@ -271,18 +245,11 @@ def find_glosses_using_ALMA(word):
    concept_count = 0
    lemma_id = data[0]["lemma_id"]
 
-   if lemma_id in glosses_dic.keys():
-      value = glosses_dic[lemma_id]
-      # Handle empty or invalid JSON gracefully
-      if value[1] and value[1].strip():
-         try:
-            glosses= json.loads(value[1])
-         except json.JSONDecodeError:
-            glosses = []  # Return empty list if JSON is invalid
-      else:
-         glosses = []  # Empty string case
-    #   glosses_list.append(json.loads(value[1]))
-      concept_count = concept_count + value[0]
+   # Decoded once for each lemma, an empty or invalid JSON gives no glosses
+   lemma_glosses = get_lemma_glosses(lemma_id)
+   if lemma_glosses is not None:
+      lemma_concept_count, glosses = lemma_glosses
+      concept_count = concept_count + lemma_concept_count
 
    return word, Undiac_lemma, Diac_lemma, pos , concept_count, glosses
 
@@ -292,6 +259,8 @@ def disambiguate_glosses_using_SALMA(glosses, Diac_lemma, Undiac_lemma, word, se
    if glosses != None:
       for gloss in glosses:
          glosses_dictionary.update({gloss['concept_id'] : gloss['gloss']})
+      # A wrong setting is raised, not handled as a failure of this word
+      check_max_candidates(settings.max_candidates)
       try:
          concept_id, gloss = GlossPredictor(Diac_lemma, Undiac_lemma,word,sentence,glosses_dictionary)
       except Exception as e:
@@ -319,95 +288,56 @@ def disambiguate_glosses_using_SALMA(glosses, Diac_lemma, Undiac_lemma, word, se
       return my_json
 
 
+def take_spans(position, spans, index):
+    """
+    Same as delete_form_list, for spans sorted by their start position: instead of rebuilding the list of
+    spans, it moves an index past the spans that are consumed (matched or dropped) at this position
+    :param position: int - current position in the sentence
+    :param spans: list - candidate spans sorted by start, as [word, gloss, start, end, concept_count, undiac_lemma, diac_lemma]
+    :param index: int - index of the first span not consumed yet
+    :return: Tuple[int, list, int] - index of the first span not consumed, spans matched and the position after them
+    """
+    output = []
+    while index < len(spans) and int(spans[index][2]) <= position:
+        span = spans[index]
+        if position == int(span[2]):
+            position = int(span[3])
+            output.append([span[0], span[1], int(span[4]), span[5], span[6]])
+        index += 1
+    return index, output, position
+
+
 def find_glosses(input_sentence, two_word_lemma, three_word_lemma,four_word_lemma, five_word_lemma, ner):
+      # Candidate spans in priority order, each list is sorted by start position and swept once with its own index
+      candidates = [five_word_lemma, four_word_lemma, three_word_lemma, two_word_lemma, ner]
+      indexes = [0] * len(candidates)
       output_list = []
       position = 0
       while position < len(input_sentence):
          flag = "False"
-         output_from5word = delete_form_list(position, five_word_lemma)
-         five_word_lemma = output_from5word[0]
-         if output_from5word[1] != []: # output
-            position = output_from5word[2]
-            flag = "True"
-            my_json = {}
-            my_json['word'] = output_from5word[1][0][0]
-            my_json['concept_count'] = output_from5word[1][0][2]
-            my_json['glosses'] = output_from5word[1][0][1]
-            my_json['Diac_lemma'] = output_from5word[1][0][4]
-            my_json['Undiac_lemma'] = output_from5word[1][0][3]
-            output_list.append(my_json)
-            position = position + 1
-
-
-
-         output_from4word = delete_form_list(position, four_word_lemma)
-         four_word_lemma = output_from4word[0]
-         if output_from4word[1] != []: # output
-            position = output_from4word[2]
-            flag = "True"
-            my_json = {}
-            my_json['word'] = output_from4word[1][0][0]
-            my_json['concept_count'] = output_from4word[1][0][2]
-            my_json['glosses'] = output_from4word[1][0][1]
-            my_json['Diac_lemma'] = output_from4word[1][0][4]
-            my_json['Undiac_lemma'] = output_from4word[1][0][3]
-            output_list.append(my_json)
-            position = position + 1
-
-         output_from3word = delete_form_list(position, three_word_lemma)
-         three_word_lemma = output_from3word[0]
-         if output_from3word[1] != []: # output
-            position = output_from3word[2]
-            flag = "True"
-            my_json = {}
-            my_json['word'] = output_from3word[1][0][0]
-            my_json['concept_count'] = output_from3word[1][0][2]
-            my_json['glosses'] = output_from3word[1][0][1]
-            my_json['Diac_lemma'] = output_from3word[1][0][4]
-            my_json['Undiac_lemma'] = output_from3word[1][0][3]
-            output_list.append(my_json)
-            position = position + 1
-
-
-
-         output_from2Word = delete_form_list(position, two_word_lemma)
-         two_word_lemma = output_from2Word[0]
-         if output_from2Word[1] != []:
-            position = output_from2Word[2]
-            flag = "True"
-            my_json = {}
-            word = output_from2Word[1][0][0]
-            my_json['word'] = word
-            my_json['concept_count'] = output_from2Word[1][0][2]
-            my_json['glosses'] = output_from2Word[1][0][1]
-            my_json['Diac_lemma'] = output_from2Word[1][0][4]
-            my_json['Undiac_lemma'] = output_from2Word[1][0][3]
-            output_list.append(my_json)
-            position = position + 1
-
-
-
-         output_from_ner = delete_form_list(position, ner)
-         ner = output_from_ner[0]
-         if output_from_ner[1] != []:
-            position = output_from_ner[2]
-            flag = "True"
-            my_json = {}
-            word = output_from_ner[1][0][0]
-            my_json['word'] = word
-            # my_json['concept_count'] = output_from_ner[1][0][2]
-            my_json['concept_count'] = '*'
-            my_json['glosses'] = output_from_ner[1][0][1]
-            my_json['Diac_lemma'] = output_from_ner[1][0][4]
-            my_json['Undiac_lemma'] = output_from_ner[1][0][3]
-            output_list.append(my_json)
-            # print("output list: ", output_list)
-            position = position + 1
+         for i, spans in enumerate(candidates):
+            indexes[i], output, end = take_spans(position, spans, indexes[i])
+            if output != []: # output
+               start = position
+               position = end
+               flag = "True"
+               my_json = {}
+               my_json['start'] = start
+               my_json['end'] = end
+               my_json['word'] = output[0][0]
+               my_json['concept_count'] = '*' if spans is ner else output[0][2]
+               my_json['glosses'] = output[0][1]
+               my_json['Diac_lemma'] = output[0][4]
+               my_json['Undiac_lemma'] = output[0][3]
+               output_list.append(my_json)
+               position = position + 1
 
          if flag == "False": # Not found in ner or in multi_word_dictionary, ASK ALMA
             word = input_sentence[position]
             word, Undiac_lemma, Diac_lemma, pos , concept_count, glosses = find_glosses_using_ALMA(word)
             my_json = {}
+            my_json['start'] = position
+            my_json['end'] = position
             my_json['word'] = word
             my_json['concept_count'] = concept_count
             my_json['glosses'] = glosses
@@ -451,25 +381,123 @@ def disambiguate_glosses_main(word, sentence):
       Undiac_lemma = word['Undiac_lemma']
       return disambiguate_glosses_using_SALMA(glosses, Diac_lemma, Undiac_lemma, input_word, sentence)
 
+def disambiguate_glosses_batch(words, sentences):
+   """
+   Same as calling disambiguate_glosses_main for each word, but the glosses of all the ambiguous words are
+   scored together in a few padded forward passes, instead of one pass for each word
+   :param words: list[dict] - words returned by find_glosses
+   :param sentences: list[str] - sentence of each word
+   :return: list[dict] - result of each word, in the same order
+   """
+   results = [None] * len(words)
+   requests = []
+   request_words = []
+
+   for i, (word, sentence) in enumerate(zip(words, sentences)):
+      concept_count = word['concept_count']
+      if concept_count == 0 or concept_count == 1 or concept_count == '*' or word['glosses'] == None:
+         results[i] = disambiguate_glosses_main(word, sentence)
+         continue
+
+      input_word = normalizearabert(word['word'])
+      glosses_dictionary = {}
+      for gloss in word['glosses']:
+         glosses_dictionary.update({gloss['concept_id'] : gloss['gloss']})
+      requests.append((word['Diac_lemma'], word['Undiac_lemma'], input_word, sentence, glosses_dictionary))
+      request_words.append(i)
+
+   # A wrong setting is raised, not handled as a failure of the batch
+   check_max_candidates(settings.max_candidates)
+   try:
+      predictions = GlossPredictorBatch(requests)
+   except Exception as e:
+      # Score the words one by one, so a failure only affects its own word
+      import logging
+      logging.getLogger(__name__).warning(f"GlossPredictorBatch failed for {len(requests)} words, scoring them one by one: {e}")
+      for i in request_words:
+         results[i] = disambiguate_glosses_main(words[i], sentences[i])
+      return results
+
+   for i, (concept_id, gloss), request in zip(request_words, predictions, requests):
+      my_json = {}
+      my_json['concept_id'] = concept_id
+      my_json['word'] = request[2]
+      my_json['lemma'] = request[0]
+      results[i] = my_json
+   return results
+
 def WSD(sentence):
 
    input_sentence = simple_word_tokenize(sentence)
 
-   five_word_lemma = find_five_word_lemma(input_sentence)
+   multi_word_lemmas = find_multi_word_lemmas(input_sentence)
+
+   five_word_lemma = multi_word_lemmas[5]
 
-   four_word_lemma = find_four_word_lemma(input_sentence)
+   four_word_lemma = multi_word_lemmas[4]
 
-   three_word_lemma = find_three_word_lemma(input_sentence)
+   three_word_lemma = multi_word_lemmas[3]
 
-   two_word_lemma = find_two_word_lemma(input_sentence)
+   two_word_lemma = multi_word_lemmas[2]
 
    ner = find_named_entities(" ".join(input_sentence))
 
    output_list = find_glosses(input_sentence, two_word_lemma, three_word_lemma, four_word_lemma, five_word_lemma, ner)
-   results = []
-   for word in output_list:
-      results.append(disambiguate_glosses_main(word, sentence))
-   return results
+   return disambiguate_glosses_batch(output_list, [sentence] * len(output_list))
+
+
+def disambiguate_document(document):
+    """
+    This method disambiguates a whole document, without the length limit of `disambiguate`. The document is split into sentences with `sentence_tokenizer`, the multi-word lemmas, named entities and lemmas are found for each sentence, the NER model tags all the sentences in batches, and the ambiguous words of all the sentences are disambiguated together in shared model batches.
+
+    Args:
+        document (:obj:`str`): The Arabic text to be disambiguated.
+
+    Returns:
+        :obj:`list`: A list of JSON objects, the same ones returned by `disambiguate`, with the start and end (inclusive) positions of each word (or multi-word) among the tokens of the document, as returned by `simple_word_tokenize`.
+
+    **Example:**
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from sinatools.wsd.disambiguator import disambiguate_document
+        result = disambiguate_document("مختبر سينا لحوسبة اللغة والذكاء الإصطناعي. في جامعة بيرزيت.")
+        print(result)
+
+        #output
+        [{
+            'concept_id': '...',
+            'word': 'مختبر',
+            'lemma': '...',
+            'start': 0,
+            'end': 0
+        }, ...]
+    """
+    if not document or not document.strip():
+       return []
+    sentences = sentence_tokenizer(document)
+    sentences_tokens = [simple_word_tokenize(sentence) for sentence in sentences]
+    sentences_ner = find_named_entities_batch([" ".join(tokens) for tokens in sentences_tokens])
+
+    words = []
+    words_sentences = []
+    words_offsets = []
+    # Position of the first token of the sentence among the tokens of the document
+    offset = 0
+    for sentence, input_sentence, ner in zip(sentences, sentences_tokens, sentences_ner):
+       multi_word_lemmas = find_multi_word_lemmas(input_sentence)
+       output_list = find_glosses(input_sentence, multi_word_lemmas[2], multi_word_lemmas[3], multi_word_lemmas[4], multi_word_lemmas[5], ner)
+       words += output_list
+       words_sentences += [sentence] * len(output_list)
+       words_offsets += [offset] * len(output_list)
+       offset += len(input_sentence)
+
+    results = disambiguate_glosses_batch(words, words_sentences)
+    for result, word, offset in zip(results, words, words_offsets):
+       result['start'] = offset + word['start']
+       result['end'] = offset + word['end']
+    return results
 
 
 def disambiguate(sentence):
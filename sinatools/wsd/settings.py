@@ -1,12 +1,11 @@
-from transformers import BertTokenizer,BertForSequenceClassification
 import warnings
 warnings.filterwarnings("ignore")
-import pandas as pd
 
 
 
 
 from sinatools.DataDownload import downloader
+from sinatools.utils import model_registry
 import os 
 
 
@@ -18,8 +17,35 @@ tokenizer_file_name = "bert-base-arabertv02"
 path =downloader.get_appdatadir()
 tokenizer_file_path = os.path.join(path, tokenizer_file_name)
 
-dftrue = pd.DataFrame()
+# Number of subwords of context kept on each side of the target word when it is paired with its glosses,
+# None keeps the whole sentence
+context_window = None
 
-model = BertForSequenceClassification.from_pretrained(model_file_path, output_hidden_states=True, num_labels=2)
+# Number of glosses of a target word kept for scoring, the glosses that share the most words with the context are
+# kept and ties keep the dictionary order, None scores all of them. It must be None or at least 1, the WSD raises
+# ValueError otherwise
+max_candidates = None
 
-tokenizer = BertTokenizer.from_pretrained('{}'.format(tokenizer_file_path))
\ No newline at end of file
+
+def get_model():
+    """
+    Returns the gloss scoring model, in evaluation mode. The model is loaded on first use and shared with
+    semantic relatedness, which uses its encoder.
+    """
+    return model_registry.get_sequence_classifier(model_file_path)
+
+
+def get_tokenizer():
+    """
+    Returns the tokenizer of the gloss scoring model. The tokenizer is loaded on first use.
+    """
+    return model_registry.get_tokenizer(tokenizer_file_path)
+
+
+def __getattr__(name):
+    # The model and tokenizer used to be loaded at import time, keep them reachable by their old names
+    if name == "model":
+        return get_model()
+    if name == "tokenizer":
+        return get_tokenizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,66 +1,196 @@
 from sinatools.wsd import settings 
+from sinatools.wsd import get_normalized_glosses
 import re
+import functools
+import threading
 import warnings
 warnings.filterwarnings("ignore")
 import torch
 import numpy as np
-import pandas as pd
 from sinatools.arabert.preprocess import ArabertPreprocessor
+from sinatools.utils.parser import arStrip
+
+MODEL_NAME = 'aubmindlab/bert-base-arabertv02'
+GLOSS_CACHE_SIZE = 100000
+
+@functools.lru_cache(maxsize=None)
+def get_preprocessor(model_name):
+  # One preprocessor for each model name, building it compiles all its regular expressions
+  return ArabertPreprocessor(model_name.split("/")[-1])
 
 def normalizearabert(s):
-  model_name = 'aubmindlab/bert-base-arabertv02'
-  arabert_prep = ArabertPreprocessor(model_name.split("/")[-1])
-  return arabert_prep.preprocess(str(s))
+  return get_preprocessor(MODEL_NAME).preprocess(str(s))
+
+@functools.lru_cache(maxsize=GLOSS_CACHE_SIZE)
+def _normalize_gloss(gloss):
+  return normalizearabert(gloss)
+
+def normalize_gloss(gloss):
+# """
+# same as normalizearabert, for glosses: the glosses normalized offline by prepare_wsd_glosses are looked up,
+# and the others are kept in a bounded LRU cache, since the same glosses recur across sentences
+# """
+  if not isinstance(gloss, str):
+    return normalizearabert(gloss)
+  normalized = get_normalized_glosses().get(gloss)
+  if normalized is None:
+    normalized = _normalize_gloss(gloss)
+  return normalized
 
 
 
-def glosses1(dfcand,target):
+def glosses1(example,candidates,target):
 # """
-# takes a dataframe 
+# takes the tagged example and the candidates of a target word, as returned by candidate_glosses
 # return 
 	# 'none' if the maximum logistic regression score for TRUE class is less than -2 OR
 	# the predicted gloss having the maximum logistic regression score
 # """
 
-  wic_c = []
-  wic_c, _ = read_data(dfcand,normalizearabert,target)
-  tokenizedwic_c = np.array([settings.tokenizer.encode(x, max_length=512,padding='max_length',truncation='longest_first',add_special_tokens=True) for x in wic_c])
-  max_len = 512
-  segmentswic = torch.tensor([get_segments(settings.tokenizer.convert_ids_to_tokens(i),max_len) for i in tokenizedwic_c])
-  paddedwic = tokenizedwic_c
-  attention_maskwic = np.where(paddedwic != 0, 1, 0)
-  input_idswic = torch.tensor(paddedwic)  
-  attention_maskwic = torch.tensor(attention_maskwic)
-  settings.model = settings.model.eval()
-  wicpredictions , wictrue_labels = [], []
-  b_input_ids = input_idswic
-  b_input_mask =  attention_maskwic
-  b_input_seg = segmentswic
-
-  with torch.no_grad():
-    outputs = settings.model(b_input_ids,token_type_ids=b_input_seg,attention_mask=b_input_mask)
-
-  logits = outputs[0]
-  wicpredictions.append(logits)
-  wicflat_predictions = np.concatenate(wicpredictions, axis=0)
-
-  return dfcand['Concept_id'].to_list()[np.argmax(wicflat_predictions, axis=0).flatten()[1]],dfcand['Gloss'].to_list()[np.argmax(wicflat_predictions, axis=0).flatten()[1]]
-
-def read_data(data,normalize,target):
-  c = []
-  labels = []
-  for i,row in data.iterrows():
-      
-      example = normalize(row['Example'])
-      gloss = normalize(row['Gloss'])
-      label = row['Label']
-      
-      c.append('{} [SEP] {}: {}'.format(example,target,gloss))
-      if label == 1.0:
-          labels.append(1)
-      else:
-          labels.append(0)
-  return c,labels
+  candidates = prune_candidates(example,candidates,target,settings.max_candidates)
+  wic_c = read_pairs(example,candidates,normalizearabert,target,normalize_gloss)
+  return pick_gloss(candidates, score_pairs(wic_c))
+
+def score_pairs(pairs, batch_size=64):
+# """
+# takes a list of (example, target: gloss) pairs, from one or many target words
+# returns the logits of the pairs, as an array of shape (number of pairs, 2)
+# the pairs are sorted by length and scored in batches of batch_size, each batch padded to its longest pair
+# """
+  if not pairs:
+    # Nothing to score, do not load the model
+    return np.zeros((0, 2), dtype=np.float32)
+  tokenizer = settings.get_tokenizer()
+  model = settings.get_model()
+  logits = np.zeros((len(pairs), 2), dtype=np.float32)
+  order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+
+  for start in range(0, len(order), batch_size):
+    batch = order[start:start + batch_size]
+    # Encode each (example, target: gloss) as a pair, the tokenizer adds the [SEP] between them and gives the
+    # segment ids, and the batch is padded to its longest candidate instead of 512
+    examples = [pairs[i][0] for i in batch]
+    glosses = [pairs[i][1] for i in batch]
+    encodedwic = tokenizer(examples, glosses, max_length=512, padding='longest', truncation='longest_first', return_tensors='pt')
+    b_input_ids = encodedwic['input_ids']
+    b_input_mask = encodedwic['attention_mask']
+    b_input_seg = encodedwic['token_type_ids']
+
+    with torch.no_grad():
+      outputs = model(b_input_ids,token_type_ids=b_input_seg,attention_mask=b_input_mask,output_hidden_states=False)
+
+    logits[batch] = outputs[0].cpu().numpy()
+
+  return logits
+
+def pick_gloss(candidates, logits):
+# """
+# takes the (concept_id, gloss) candidates of a target word and the logits of its pairs
+# returns the concept id and the gloss of the candidate with the maximum score for the TRUE class
+# """
+  best = np.argmax(logits, axis=0).flatten()[1]
+  return candidates[best]
+
+def read_pairs(example,candidates,normalize,target,normalize_gloss=None):
+# """
+# takes the tagged example and the (concept_id, gloss) candidates of a target word
+# returns the (example, target: gloss) pair of each candidate
+# the glosses are normalized with normalize_gloss if it is given, otherwise with normalize
+# """
+  normalize_gloss = normalize_gloss or normalize
+  example = normalize(example)
+  if settings.context_window is not None:
+    example = window_context(example, settings.context_window)
+  return [(example, '{}: {}'.format(target,normalize_gloss(gloss))) for _, gloss in candidates]
+
+_MARKER_RE = re.compile(r'\[UNUSED[01]\]')
+
+def window_context(example,window):
+# """
+# takes the normalized example, with the target word between the markers, and a number of subwords
+# returns the example cut to the words around the target that fit in window subwords on each side of it
+# only whole words are kept, so the markers and the target word are never cut
+# """
+  words = example.split()
+  marked = [i for i, word in enumerate(words) if _MARKER_RE.search(word)]
+  if not marked:
+    return example
+
+  tokenizer = settings.get_tokenizer()
+  start, budget = marked[0], window
+  while start > 0:
+    size = len(tokenizer.tokenize(words[start - 1]))
+    if size > budget:
+      break
+    budget -= size
+    start -= 1
+
+  end, budget = marked[-1] + 1, window
+  while end < len(words):
+    size = len(tokenizer.tokenize(words[end]))
+    if size > budget:
+      break
+    budget -= size
+    end += 1
+
+  if start == 0 and end == len(words):
+    return example
+  return ' '.join(words[start:end])
+
+_WORD_RE = re.compile(r'\w\w+')
+_pruning_lock = threading.Lock()
+_pruning_stats = {'words': 0, 'pruned_words': 0, 'candidates': 0, 'kept': 0}
+
+def _words(text):
+  return frozenset(_WORD_RE.findall(arStrip(str(text), digit=False)))
+
+@functools.lru_cache(maxsize=GLOSS_CACHE_SIZE)
+def _gloss_words(gloss):
+  return _words(gloss)
+
+def prune_candidates(example,candidates,target,k):
+# """
+# takes the tagged example, the (concept_id, gloss) candidates of a target word and the number of candidates to keep
+# returns the k candidates whose glosses share the most words with the example, in their original order,
+# or all the candidates if k is None or there are no more than k of them
+# the words are compared without diacritics, ties keep the dictionary order of the glosses
+# raises ValueError if k is less than 1, since no gloss could be picked
+# """
+  check_max_candidates(k)
+  kept = candidates
+  if k is not None and len(candidates) > k:
+    context = _words(_MARKER_RE.sub(' ', example)) - _words(target)
+    overlap = [len(context & _gloss_words(gloss)) for _, gloss in candidates]
+    best = sorted(sorted(range(len(candidates)), key=lambda i: -overlap[i])[:k])
+    kept = [candidates[i] for i in best]
+
+  with _pruning_lock:
+    _pruning_stats['words'] += 1
+    _pruning_stats['pruned_words'] += kept is not candidates
+    _pruning_stats['candidates'] += len(candidates)
+    _pruning_stats['kept'] += len(kept)
+  return kept
+
+def check_max_candidates(k):
+# """
+# raises ValueError if k, the number of candidates prune_candidates keeps, is not None and less than 1
+# """
+  if k is not None and k < 1:
+    raise ValueError(f"the number of candidates to keep must be None or at least 1, got {k}")
+
+def pruning_info():
+# """
+# returns the statistics of prune_candidates since the last reset, as a dictionary of
+	# words: number of target words, pruned_words: number of them that had candidates dropped,
+	# candidates: number of candidates, kept: number of candidates kept for scoring
+# """
+  with _pruning_lock:
+    return dict(_pruning_stats)
+
+def reset_pruning_info():
+  with _pruning_lock:
+    for key in _pruning_stats:
+      _pruning_stats[key] = 0
 
 def inserttag1(sentence,tag,start,end):
     before = sentence[:start]
@@ -68,17 +198,6 @@ def inserttag1(sentence,tag,start,end):
     target = sentence[start:end]
     return before+tag+sentence[start:end]+tag+after
 
-def get_segments(tokens, max_seq_length):
-    if len(tokens)>max_seq_length:
-        raise IndexError("Token length more than max seq length!")
-    segments = []
-    current_segment_id = 0
-    for token in tokens:
-        segments.append(current_segment_id)
-        if token == "[SEP]":
-            current_segment_id = 1
-    return segments + [0] * (max_seq_length - len(tokens))
-
 def senttarget(target,example):
   start = -1
   try:
@@ -99,28 +218,65 @@ def GlossPredictor(diac_lemma, undiac_lemma,target,example,glosses):
 	#	glosses =	{"Concept_id1": "gloss1",  "Concept_id2": "gloss2",  "Concept_id3": "gloss3"}
 # returns 
 	# -1   if the example does not contain the target word  OR
-	# 'none' if no records in dftrue for the lemma and if the maximum logistic regression score for TRUE class is less than -2 OR
+	# 'none' if there are no glosses for the lemma OR
 	# the predicted gloss for the target word 
 	# 
 # """
-  example = senttarget(target,example)
-  if example == -1:
+  tagged = candidate_glosses(diac_lemma, undiac_lemma,target,example,glosses)
+  if tagged is None:
     return -1,-1
-  
-  data = []
-  for g in glosses:
-      data.append([g,diac_lemma,undiac_lemma, glosses[g], target,example,0,1,'','',''])
-  dfcolumns = ['Concept_id', 'Diac_lemma', 'Undiac_lemma', 'Gloss', 'Target', 'Example', 'Is_training', 'Label', 'concept_id', 'lemma_id', 'POS']
-  dfcand = pd.DataFrame(data,columns=dfcolumns)
-  
-  
-  if len(dfcand) > 0:
-    dfcand['Example'] = dfcand['Example'].apply(lambda x: example)
-    dfcand['Target'] = dfcand['Target'].apply(lambda x: target)
-    dfcand = dfcand.drop_duplicates()
-  
-    dfcand['Example'] = dfcand['Example'].apply(lambda x: x.upper())
-    dfcand['Example'] = dfcand['Example'].apply(lambda x: re.sub(r'^((.?\[UNUSED0\].?){1})\[UNUSED0\]', r'\1[UNUSED1]', x) )
-    return glosses1(dfcand,target)
+
+  example, candidates = tagged
+  if len(candidates) > 0:
+    return glosses1(example,candidates,target)
   else:
-    return 'none','none'
\ No newline at end of file
+    return 'none','none'
+
+
+def candidate_glosses(diac_lemma, undiac_lemma,target,example,glosses):
+# """
+# takes the same arguments as GlossPredictor
+# returns
+	# None if the example does not contain the target word OR
+	# the example with the target word tagged, and the list of (concept_id, gloss) candidates, which is empty if there are no glosses
+# """
+  example = senttarget(target,example)
+  if example == -1:
+    return None
+
+  # Concept ids are the keys of the glosses dictionary, so there are no duplicate candidates
+  candidates = [(g, glosses[g]) for g in glosses]
+
+  example = example.upper()
+  example = re.sub(r'^((.?\[UNUSED0\].?){1})\[UNUSED0\]', r'\1[UNUSED1]', example)
+  return example, candidates
+
+
+def GlossPredictorBatch(requests, batch_size=64):
+# """
+# takes a list of requests, each one is the arguments of GlossPredictor (diac_lemma, undiac_lemma, target, example, glosses),
+# for the target words of one or many sentences
+# returns the result of GlossPredictor for each request, in the same order
+# the candidates of all requests are scored together with score_pairs, then the best candidate of each request is picked
+# """
+  if not requests:
+    return []
+  results = [None] * len(requests)
+  candidates = []
+  pairs = []
+  for i, (diac_lemma, undiac_lemma, target, example, glosses) in enumerate(requests):
+    tagged = candidate_glosses(diac_lemma, undiac_lemma, target, example, glosses)
+    if tagged is None:
+      results[i] = (-1,-1)
+    elif len(tagged[1]) == 0:
+      results[i] = ('none','none')
+    else:
+      word_candidates = prune_candidates(tagged[0],tagged[1],target,settings.max_candidates)
+      wic_c = read_pairs(tagged[0],word_candidates,normalizearabert,target,normalize_gloss)
+      candidates.append((i, word_candidates, len(pairs), len(pairs) + len(wic_c)))
+      pairs += wic_c
+
+  logits = score_pairs(pairs, batch_size)
+  for i, word_candidates, start, end in candidates:
+    results[i] = pick_gloss(word_candidates, logits[start:end])
+  return results
\ No newline at end of file
@@ -0,0 +1,28 @@
+import types
+
+import pytest
+
+from sinatools.morphology import lexicon
+from sinatools.morphology.lexicon import MappedLexicon, write_lexicon
+
+DICTIONARY = {"ذهب": [["ذَهَبَ", 10]], "ولد": ("وَلَدٌ", 3), "a": "latin"}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "lemmas.lex")
+    write_lexicon(DICTIONARY, path)
+    return path
+
+
+@pytest.mark.parametrize("byteorder", ["little", "big"])
+def test_reads_back_the_dictionary(path, byteorder, monkeypatch):
+    monkeypatch.setattr(lexicon, "sys", types.SimpleNamespace(byteorder=byteorder))
+    assert dict(MappedLexicon(path).items()) == DICTIONARY
+
+
+def test_keys_that_cannot_be_encoded_are_missing(path):
+    mapped = MappedLexicon(path)
+    assert mapped.get("\ud800", "default") == "default"
+    assert "\ud800" not in mapped
+    assert mapped.get(1) is None
@@ -0,0 +1,14 @@
+from sinatools.morphology import morph_analyzer
+
+
+def test_cached_solutions_are_immutable():
+    morph_analyzer.clear_cache()
+    solutions = morph_analyzer._cached_analyze_token("2023", "MSA", "1")
+    assert solutions == (("2023", 0, "2023", 0, "2023", "رقم"),)
+    assert all(isinstance(solution, tuple) for solution in solutions)
+
+
+def test_analyze_does_not_share_results_between_calls():
+    first = morph_analyzer.analyze("2023", task="pos")
+    first[0]["pos"] = "changed"
+    assert morph_analyzer.analyze("2023", task="pos") == [{"token": "2023", "pos": "رقم", "frequency": 0}]
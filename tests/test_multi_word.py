@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from sinatools.morphology import ALMA_multi_word as multi_word
+from sinatools.utils.parser import arStrip
+
+# Tokens that only have diacritics, underscores or tatweel, or have them inside a word, are the cases the
+# normalized keys of the trie must handle like arStrip does
+VOCABULARY = ["عَبْدُ", "عبد", "اللَّهِ", "الله", "رام", "بيـت", "المقدس", "في", "سبيل", "أحمد", "إلى", "ٱلقدس",
+              "َ", "ّ", "ـ", "_", "__", "ال_له", "عبد_", "ـالله"]
+
+
+def strip(text):
+    return arStrip(text, True, True, True, False, True, False)
+
+
+@pytest.fixture
+def sentences(monkeypatch):
+    rng = random.Random(7)
+    sentences = [[rng.choice(VOCABULARY) for _ in range(rng.randint(1, 9))] for _ in range(400)]
+
+    # The dictionaries hold the keys of some of the n-grams, so both lookups find matches
+    n_grams_dicts = {n: {} for n in (2, 3, 4, 5)}
+    for tokens in sentences:
+        for n in (2, 3, 4, 5):
+            for start in range(len(tokens) - n + 1):
+                if rng.random() < 0.3:
+                    key = strip(" ".join(tokens[start:start + n]))
+                    n_grams_dicts[n][key] = [[key, n, "", "{}-{}".format(n, key)]]
+
+    monkeypatch.setattr(multi_word, "get_n_grams_dict", lambda n: n_grams_dicts[n])
+    return sentences, n_grams_dicts
+
+
+def test_trie_finds_the_n_grams_alma_multi_word_finds(sentences):
+    sentences, n_grams_dicts = sentences
+    trie = multi_word.MultiWordTrie(n_grams_dicts)
+
+    for tokens in sentences:
+        expected = []
+        for start in range(len(tokens)):
+            for n in (2, 3, 4, 5):
+                if start + n <= len(tokens):
+                    found = multi_word.ALMA_multi_word(" ".join(tokens[start:start + n]), n)
+                    if found:
+                        expected.append((start, n, found[0]["ids"]))
+
+        actual = [(start, n, [result[3] for result in result_word]) for start, n, result_word in trie.find(tokens)]
+        assert actual == expected, tokens
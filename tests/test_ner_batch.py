@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from sinatools.ner.nn import BertNestedTagger, BertSeqTagger
+
+
+@pytest.fixture
+def bert_config(tmp_path):
+    # A one layer BERT, the taggers' classifiers expect a hidden size of 768
+    config = {
+        "hidden_size": 768,
+        "num_hidden_layers": 1,
+        "num_attention_heads": 12,
+        "intermediate_size": 64,
+        "vocab_size": 100,
+        "max_position_embeddings": 64,
+        "hidden_dropout_prob": 0.0,
+        "attention_probs_dropout_prob": 0.0,
+    }
+    path = tmp_path / "bert_config.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+@pytest.mark.parametrize("build", [
+    lambda config: BertNestedTagger(bert_model=None, num_labels=[3, 5], bert_config=config),
+    lambda config: BertSeqTagger(None, num_labels=4, bert_config=config),
+])
+def test_padding_does_not_change_logits(bert_config, build):
+    torch.manual_seed(0)
+    model = build(bert_config).eval()
+    # BERT built from a config is left uninitialized for the checkpoint to fill in
+    model.bert.init_weights()
+    short = torch.tensor([[2, 10, 11, 3]])
+    long = torch.tensor([[2, 20, 21, 22, 23, 24, 3]])
+    padded = torch.nn.utils.rnn.pad_sequence([short[0], long[0]], batch_first=True, padding_value=0)
+
+    with torch.no_grad():
+        alone = model(short)
+        batched = model(padded)
+
+    assert torch.allclose(batched[0, :short.shape[1]], alone[0], atol=1e-5)
+
+
+def _ner_model_available():
+    from sinatools.ner import model_path
+    return os.path.isdir(model_path)
+
+
+@pytest.mark.skipif(not _ner_model_available(), reason="the NER model is not downloaded")
+def test_extract_batch_matches_extract():
+    from sinatools.ner.entity_extractor import extract, extract_batch
+
+    texts = [
+        "ذهب محمد الى جامعة بيرزيت",
+        "يقع المسجد الأقصى في القدس وهو من أقدم المساجد في فلسطين",
+        "رام الله",
+    ]
+    assert extract_batch(texts) == [extract(text) for text in texts]
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("safetensors")
+
+from sinatools.ner.trainers.BaseTrainer import BaseTrainer, INFERENCE_CHECKPOINT
+
+
+def save_training_checkpoint(path, model, epoch):
+    torch.save({"model": model.state_dict()}, os.path.join(path, "checkpoint_{}.pt".format(epoch)))
+
+
+def make_trainer(value):
+    model = torch.nn.Linear(2, 1)
+    torch.nn.init.constant_(model.weight, value)
+    return BaseTrainer(model=model)
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    path = str(tmp_path)
+    save_training_checkpoint(path, make_trainer(1.0).model, 0)
+    make_trainer(2.0).export(os.path.join(path, INFERENCE_CHECKPOINT))
+    return path
+
+
+def loaded_weight(path, **kwargs):
+    trainer = make_trainer(0.0)
+    trainer.load(path, **kwargs)
+    return trainer.model.weight[0, 0].item()
+
+
+def test_inference_checkpoint_is_preferred(checkpoints):
+    assert loaded_weight(checkpoints) == 2.0
+
+
+def test_training_checkpoint_can_be_forced(checkpoints):
+    assert loaded_weight(checkpoints, prefer_inference=False) == 1.0
+
+
+def test_newer_training_checkpoint_wins(checkpoints):
+    save_training_checkpoint(checkpoints, make_trainer(3.0).model, 1)
+    inference = os.path.join(checkpoints, INFERENCE_CHECKPOINT)
+    os.utime(inference, (0, 0))
+    assert loaded_weight(checkpoints) == 3.0
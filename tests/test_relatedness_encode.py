@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from sinatools.semantic_relatedness import compute_relatedness
+
+WORDS = ["الأرض", "تدور", "حول", "الشمس", "الجو", "جميل", "اليوم"]
+SENTENCES = ["الأرض تدور حول الشمس", "الجو جميل", "الجو جميل اليوم", "الشمس"]
+
+
+class FakeTokenizer:
+    # One ID for each word, with 0 as padding
+    def __call__(self, batch, padding, truncation, max_length, return_tensors):
+        ids = [[WORDS.index(word) + 1 for word in sentence.split()] for sentence in batch]
+        length = max(len(sentence_ids) for sentence_ids in ids)
+        input_ids = torch.tensor([sentence_ids + [0] * (length - len(sentence_ids)) for sentence_ids in ids])
+        return {"input_ids": input_ids, "attention_mask": (input_ids != 0).long()}
+
+
+class FakeModel:
+    def __init__(self):
+        self.embeddings = torch.randn(len(WORDS) + 1, 8, generator=torch.Generator().manual_seed(0))
+        self.batches = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batches.append(len(input_ids))
+
+        class Output:
+            last_hidden_state = self.embeddings[input_ids]
+        return Output()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(compute_relatedness, "get_tokenizer", lambda: FakeTokenizer())
+    monkeypatch.setattr(compute_relatedness, "get_model", lambda: model)
+    compute_relatedness.set_cache_size()
+    compute_relatedness.clear_cache()
+    yield model
+    compute_relatedness.set_cache_size()
+    compute_relatedness.clear_cache()
+
+
+def test_similarity_matrix_matches_pairwise_scores(model):
+    scores = compute_relatedness.similarity_matrix(SENTENCES[:2], SENTENCES, batch_size=3)
+    assert scores.shape == (2, len(SENTENCES))
+    for i, a in enumerate(SENTENCES[:2]):
+        for j, b in enumerate(SENTENCES):
+            assert scores[i, j] == pytest.approx(compute_relatedness.get_similarity_score(a, b), abs=1e-5)
+    assert scores[0, 0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_padding_does_not_change_the_embedding(model):
+    alone = compute_relatedness.encode(["الشمس"], use_cache=False)
+    batched = compute_relatedness.encode(SENTENCES, use_cache=False)
+    np.testing.assert_allclose(batched[3], alone[0], atol=1e-6)
+
+
+def test_cache_hits_and_misses(model):
+    compute_relatedness.encode(SENTENCES[:2] + SENTENCES[:1])
+    assert compute_relatedness.cache_info() == {"hits": 0, "misses": 2, "maxsize": 10000, "currsize": 2}
+    assert model.batches == [2]
+
+    compute_relatedness.encode(SENTENCES)
+    assert compute_relatedness.cache_info() == {"hits": 2, "misses": 4, "maxsize": 10000, "currsize": 4}
+    assert model.batches == [2, 2]
+
+    compute_relatedness.encode(SENTENCES)
+    assert compute_relatedness.cache_info()["hits"] == 6
+    assert model.batches == [2, 2]
+
+    compute_relatedness.encode(SENTENCES, use_cache=False)
+    assert compute_relatedness.cache_info()["hits"] == 6
+    assert model.batches == [2, 2, 4]
+
+
+def test_cache_discards_the_least_recently_used(model):
+    compute_relatedness.set_cache_size(2)
+    compute_relatedness.encode(SENTENCES[:2])
+    compute_relatedness.encode(SENTENCES[:1])
+    compute_relatedness.encode(SENTENCES[2:3])
+    compute_relatedness.encode(SENTENCES[:2])
+    assert compute_relatedness.cache_info() == {"hits": 2, "misses": 4, "maxsize": 2, "currsize": 2}
+
+
+def test_empty_input_does_not_load_the_model(monkeypatch):
+    def fail():
+        raise AssertionError("the model must not be loaded")
+
+    monkeypatch.setattr(compute_relatedness, "get_model", fail)
+    monkeypatch.setattr(compute_relatedness, "get_tokenizer", fail)
+    assert compute_relatedness.encode([]).shape == (0, 0)
+    assert compute_relatedness.similarity_matrix([], []).shape == (0, 0)
@@ -0,0 +1,46 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+from sinatools.semantic_relatedness import index
+from sinatools.semantic_relatedness.compute_relatedness import normalize_rows
+
+
+def fake_encode(sentences, batch_size=64, use_cache=True):
+    # Deterministic random embeddings, one for each sentence text
+    return np.stack([np.random.default_rng(int(hashlib.md5(s.encode("utf-8")).hexdigest()[:8], 16))
+                     .normal(size=16).astype(np.float32) for s in sentences])
+
+
+@pytest.fixture
+def corpus(monkeypatch):
+    monkeypatch.setattr(index, "encode", fake_encode)
+    return ["جملة رقم {}".format(i) for i in range(3000)]
+
+
+def exact_top_k(corpus, query, k):
+    scores = normalize_rows(fake_encode(corpus)) @ normalize_rows(fake_encode([query]))[0]
+    return list(np.argsort(-scores)[:k])
+
+
+def test_search_matches_exact_top_k(corpus, tmp_path):
+    index.build_index(corpus, str(tmp_path), ids=["id-{}".format(i) for i in range(len(corpus))], chunk_size=700)
+    opened = index.load_index(str(tmp_path))
+
+    results = opened.search(["جملة رقم 17", "سؤال"], k=5, block_size=1000)
+    for query, result in zip(["جملة رقم 17", "سؤال"], results):
+        rows = exact_top_k(corpus, query, 5)
+        assert [r["id"] for r in result] == ["id-{}".format(row) for row in rows]
+        assert [r["sentence"] for r in result] == [corpus[row] for row in rows]
+    assert results[0][0]["score"] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_ivf_with_all_lists_probed_is_exact(corpus, tmp_path):
+    index.build_index(corpus, str(tmp_path), n_lists=20)
+    opened = index.load_index(str(tmp_path))
+
+    assert len(opened) == len(corpus)
+    assert [r["id"] for r in opened.search("سؤال", k=5, n_probe=20)] == exact_top_k(corpus, "سؤال", 5)
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from sinatools.DataDownload import downloader
+
+
+def _models_available(*names):
+    return all(os.path.isdir(os.path.join(downloader.get_appdatadir(), name)) for name in names)
+
+
+DOCUMENT = ("افتتح الرئيس مؤتمر التعليم في رام الله يوم الاثنين. "
+            "وشارك في المؤتمر وزير التربية محمد أحمد. "
+            "وعقدت ندوة عن التعليم في جامعة بيرزيت.")
+
+needs_ner = pytest.mark.skipif(not _models_available("Wj27012000.tar"), reason="the NER model is not downloaded")
+needs_relation = pytest.mark.skipif(not _models_available("Wj27012000.tar", "relation_model"),
+                                    reason="the NER or relation model is not downloaded")
+
+
+@needs_ner
+def test_document_entities_match_sentence_entities():
+    from sinatools.relations.relation_extractor import entities_and_types, sentences_entities_and_types
+    from sinatools.utils.tokenizer import sentence_tokenizer
+
+    sentences = sentence_tokenizer(DOCUMENT)
+    assert sentences_entities_and_types(sentences) == [entities_and_types(sentence) for sentence in sentences]
+
+
+@needs_relation
+def test_triples_match_sentence_entities(monkeypatch):
+    from sinatools.relations import relation_extractor
+
+    triples = relation_extractor.event_argument_relation_extraction(DOCUMENT)
+
+    # The per-sentence NER path that the document level pass replaced
+    monkeypatch.setattr(relation_extractor, "sentences_entities_and_types",
+                        lambda sentences: [relation_extractor.entities_and_types(sentence) for sentence in sentences])
+    assert triples == relation_extractor.event_argument_relation_extraction(DOCUMENT)
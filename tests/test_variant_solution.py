@@ -0,0 +1,84 @@
+import re
+
+import pytest
+
+from sinatools.morphology import morph_analyzer
+from sinatools.morphology.lexicon import build_variant_index
+from sinatools.utils.parser import arStrip
+
+# token, freq, lemma, lemma_id, root, pos
+DICTIONARY = {
+    "أكل": [["أكل", 30, "أَكَلَ", 1, "أكل", "فعل"], ["أكل", 10, "أَكْل", 2, "أكل", "اسم"]],
+    "اكل": [["اكل", 5, "آكِل", 3, "أكل", "اسم"]],
+    "إلى": [["إلى", 90, "إِلَى", 4, "-", "حرف جر"]],
+    "كتب": [["كتب", 40, "كَتَبَ", 5, "كتب", "فعل"]],
+    "كُتُب": [["كُتُب", 20, "كِتاب", 6, "كتب", "اسم"]],
+    "مدرسة": [["مدرسة", 25, "مَدْرَسَة", 7, "درس", "اسم"]],
+    "آمن": [["آمن", 15, "آمَنَ", 8, "أمن", "فعل"]],
+    "امن": [["امن", 3, "أَمْن", 9, "أمن", "اسم"]],
+}
+
+TOKENS = [
+    "أكل", "اكل", "إكل", "آكل", "أَكَلَ", "أَكْلٌ", "اَكَلَ",
+    "الى", "إلى", "إِلَى", "الَى", "أَلَى",
+    "كتب", "كُتُب", "كُتِبَ", "كَتَّبَ", "كُتُبٌ",
+    "مدرسة", "مَدْرَسَةٌ", "مدرسه", "المدرسة",
+    "آمن", "امن", "أمن", "آمَنَ", "أَمْن", "إمن",
+    "قلم", "قَلَمٌ",
+]
+
+
+def old_find_solution(token, language, flag):
+    # The fallback chain of the analyzer before the variant index
+    find_solution = morph_analyzer.find_solution
+    result_token = find_solution(token, language, flag)
+
+    if result_token == []:
+        token_without_al = re.sub(r'^[ﻝ]', '', re.sub(r'^[ﺍ]', '', token))
+        if len(token_without_al) > 5:
+            result_token = find_solution(token_without_al, language, flag)
+
+    if result_token == []:
+        result_token = find_solution(re.sub(r'[ﻩ]$', 'ﺓ', token), language, flag)
+
+    if result_token == []:
+        word_with_unify_alef = arStrip(token, False, False, False, False, True, False)
+        result_token = find_solution(word_with_unify_alef, language, flag)
+
+    if result_token == []:
+        word_undiac = arStrip(token, True, False, True, True, False, False)
+        result_token = find_solution(word_undiac, language, flag)
+
+    if result_token == []:
+        word_undiac = arStrip(token, True, True, True, False, True, False)
+        result_token = find_solution(word_undiac, language, flag)
+
+    return result_token
+
+
+def new_find_solution(token, language, flag):
+    result_token = morph_analyzer.find_solution(token, language, flag)
+    if result_token == []:
+        result_token = morph_analyzer.find_variant_solution(token, language, flag)
+    return result_token
+
+
+@pytest.fixture
+def small_dictionary(monkeypatch):
+    monkeypatch.setattr(morph_analyzer, "get_dictionary", lambda: DICTIONARY)
+    monkeypatch.setattr(morph_analyzer, "get_variant_index", lambda: build_variant_index(DICTIONARY.keys()))
+
+
+@pytest.mark.parametrize("flag", ["1", "*"])
+@pytest.mark.parametrize("token", TOKENS)
+def test_variant_lookup_matches_the_arstrip_chain(small_dictionary, token, flag):
+    assert morph_analyzer._is_ar(token)
+    assert new_find_solution(token, "MSA", flag) == old_find_solution(token, "MSA", flag)
+
+
+def test_variant_lookup_order(small_dictionary):
+    # Unified alef is tried before removing the diacs, removing the diacs before both
+    assert morph_analyzer.find_variant_solution("إكل", "MSA", "1")[0][0] == "اكل"
+    assert morph_analyzer.find_variant_solution("إِلَى", "MSA", "1")[0][0] == "إلى"
+    assert morph_analyzer.find_variant_solution("أَمْن", "MSA", "1")[0][0] == "امن"
+    assert morph_analyzer.find_variant_solution("قَلَمٌ", "MSA", "1") == []
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from sinatools.utils.tokenizers_words import simple_word_tokenize
+from sinatools.wsd import disambiguator
+
+DOCUMENT = "مختبر سينا لحوسبة اللغة والذكاء الإصطناعي. في جامعة بيرزيت!\nهل تعرفه؟ نعم، أعرفه."
+
+
+def spans_of(tokens, words, concept_count, glosses):
+    # Spans in the format of the multi-word lemmas and the named entities
+    n = len(words)
+    return [[" ".join(words), glosses, i, i + n - 1, concept_count, " ".join(words), " ".join(words)]
+            for i in range(len(tokens) - n + 1) if tokens[i:i + n] == words]
+
+
+@pytest.fixture
+def no_models(monkeypatch):
+    def find_multi_word_lemmas(input_sentence):
+        lemmas = {n: [] for n in (2, 3, 4, 5)}
+        lemmas[2] = spans_of(input_sentence, ["جامعة", "بيرزيت"], 1, [{"concept_id": "1", "gloss": "جامعة"}])
+        return lemmas
+
+    def find_named_entities_batch(strings):
+        return [spans_of(string.split(), ["سينا"], 1, [{"concept_id": "", "gloss": "اسم منظمة"}]) for string in strings]
+
+    def find_glosses_using_ALMA(word):
+        return word, word, word, "", 0, []
+
+    monkeypatch.setattr(disambiguator, "find_multi_word_lemmas", find_multi_word_lemmas)
+    monkeypatch.setattr(disambiguator, "find_named_entities_batch", find_named_entities_batch)
+    monkeypatch.setattr(disambiguator, "find_glosses_using_ALMA", find_glosses_using_ALMA)
+
+
+def test_offsets_index_the_tokens_of_the_document(no_models):
+    tokens = simple_word_tokenize(DOCUMENT)
+    results = disambiguator.disambiguate_document(DOCUMENT)
+
+    assert [result["word"] for result in results] == [" ".join(tokens[r["start"]:r["end"] + 1]) for r in results]
+    # Every token of the document is covered once, in order
+    assert [result["start"] for result in results][0] == 0
+    assert all(a["end"] + 1 == b["start"] for a, b in zip(results, results[1:]))
+    assert results[-1]["end"] == len(tokens) - 1
+    assert "جامعة بيرزيت" in [result["word"] for result in results]
+
+
+@pytest.mark.parametrize("document", ["", "   ", "\n"])
+def test_empty_document_does_not_run_ner(monkeypatch, document):
+    def extract_batch(*args, **kwargs):
+        raise AssertionError("the NER model must not be run")
+
+    monkeypatch.setattr(disambiguator, "extract_batch", extract_batch)
+    assert disambiguator.disambiguate_document(document) == []
+    assert disambiguator.find_named_entities_batch([]) == []
+    assert disambiguator.find_named_entities_batch(["", " "]) == [[], []]
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from sinatools.wsd.wsd import prune_candidates
+
+CANDIDATES = [("1", "حيوان أليف"), ("2", "ذهب الولد إلى المدرسة"), ("3", "معدن ثمين"), ("4", "مضى")]
+EXAMPLE = "ذهبَ الولدُ [UNUSED0]ذهب[UNUSED0] إلى المدرسة"
+
+
+def test_keeps_the_glosses_with_the_most_overlap_in_their_order():
+    assert prune_candidates(EXAMPLE, CANDIDATES, "ذهب", 2) == [CANDIDATES[0], CANDIDATES[1]]
+
+
+def test_none_keeps_all_candidates():
+    assert prune_candidates(EXAMPLE, CANDIDATES, "ذهب", None) == CANDIDATES
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_rejects_keeping_no_candidate(k):
+    with pytest.raises(ValueError):
+        prune_candidates(EXAMPLE, CANDIDATES, "ذهب", k)
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from sinatools.wsd import settings
+from sinatools.wsd.wsd import GlossPredictorBatch, score_pairs
+
+
+@pytest.fixture
+def no_model(monkeypatch):
+    def fail():
+        raise AssertionError("the model must not be loaded")
+    monkeypatch.setattr(settings, "get_model", fail)
+    monkeypatch.setattr(settings, "get_tokenizer", fail)
+
+
+def test_no_pairs_do_not_load_the_model(no_model):
+    assert score_pairs([]).shape == (0, 2)
+    assert GlossPredictorBatch([]) == []
+
+
+def test_requests_without_candidates_do_not_load_the_model(no_model):
+    requests = [
+        # The target word is not in the example
+        ("ذَهَبَ", "ذهب", "ذهب", "جاء الولد", {"1": "مضى"}),
+        # The target word has no glosses
+        ("وَلَدٌ", "ولد", "الولد", "جاء الولد", {}),
+    ]
+    assert GlossPredictorBatch(requests) == [(-1, -1), ("none", "none")]